@@ -6,79 +6,142 @@ Date: 2024
 License: MIT License
 """
 
-import copy
+import collections
+import importlib
+import math
+import os
 import random
+import sys
 import timeit
 
-def play(board):
+# The Engine Is Re-exported Here; Heavier Modules (argparse, multiprocessing, sqlite3, the Server
+# And Benchmark Tools) Are Imported Where They Are Used, So The Game Starts Quickly
+import sudoku_engine
+from sudoku_engine import (DIFFICULTIES, MAX_WIDTH, SOLVER_ENGINES, SYMBOLS, SYMMETRIES, Board, Candidates, Profiler,
+                           SolutionCache, backtrack, boardCells, boardTables, boardToLine, cluesConsistent, generate,
+                           inferred, lineToBoard, reachableDifficulties, solve, symbolValue)
+
+def __getattr__(name):
+    """
+    Names re-exported from the engine (its __all__) and from the optional modules in LAZY_NAMES,
+    which are imported on first use
+    """
+    if name in sudoku_engine.__all__:
+        return getattr(sudoku_engine, name)
+    if name in LAZY_NAMES:
+        return getattr(importlib.import_module(LAZY_NAMES[name]), name)
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+# Module Holding Each Lazily Re-exported Name
+LAZY_NAMES = {
+    "PROFILER": "sudoku_engine",
+    "exactCover": "sudoku_dlx",
+    "coverPlacement": "sudoku_dlx",
+    "uncoverPlacement": "sudoku_dlx",
+    "importNumpy": "sudoku_numpy",
+    "numpyBoards": "sudoku_numpy",
+    "numpySinglesStep": "sudoku_numpy",
+    "numpyInferred": "sudoku_numpy",
+    "numpySolveBatch": "sudoku_numpy",
+    "PORTFOLIO": "sudoku_portfolio",
+    "PORTFOLIO_POLL": "sudoku_portfolio",
+    "portfolioJob": "sudoku_portfolio",
+    "configuredSearch": "sudoku_portfolio",
+    "serviceRequest": "sudoku_server",
+    "serviceSolveBatch": "sudoku_server",
+    "serviceSolve": "sudoku_server",
+    "serviceWorkerStart": "sudoku_server",
+    "requestBoard": "sudoku_server",
+    "checkRequest": "sudoku_server",
+    "SERVICE_FIELDS": "sudoku_server",
+    "SERVICE_OPS": "sudoku_server",
+    "SERVICE_MAX_SIZE": "sudoku_server",
+    "SudokuServer": "sudoku_server",
+    "serve": "sudoku_server",
+    "Archive": "sudoku_archive",
+    "ArchiveWriter": "sudoku_archive",
+    "packCells": "sudoku_archive",
+    "unpackBoard": "sudoku_archive",
+    "textToArchive": "sudoku_archive",
+    "archiveToText": "sudoku_archive",
+    "ARCHIVE_SUFFIX": "sudoku_archive",
+}
+
+def play(board, bank = None, prefetcher = None, renderer = None):
     """
     Game loop
 
     Args:
         board (int array): sudoku board for the player to solve
+        bank (PuzzleBank, optional): bank to serve new boards from. Defaults to None.
+        prefetcher (BoardPrefetcher, optional): background generation of the next new board.
+                                                Defaults to None.
+        renderer (BoardRenderer, optional): draws the board and messages. Defaults to printing
+                                            each board in full.
 
     Returns:
         int: return zero on game success
     """
+    if renderer is None:
+        renderer = BoardRenderer()
 
-    # Deep Copy Board For Undo Function
-    boardCopy = copy.deepcopy(board)
-    printBoard(board)
-    movesList = []
+    # Game State, Rolled Back For Undo And Restart
+    session = GameSession(board)
+    renderer.draw(session.board)
 
     # Play Game Until Solved
     while True:
 
         # Assign User Input
-        userInput = input("Enter move as 'row col value' OR 'help' : ").split(' ')
-        if len(userInput) == 3 and userInput[0].isdecimal() and userInput[1].isdecimal() and userInput[2].isdecimal():
-            i = int(userInput[0])
-            j = int(userInput[1])
-            x = int(userInput[2])
+        userText = input("Enter move as 'row col value' OR 'help' : ")
+        userInput = userText.split(' ')
+        move = parseMove(userText, session.n)
+        if move is not None:
+            i, j, x = move
 
             # Check Allowed Moves & Update Board If Allowed
-            allowedMoves = options(board, i, j)
-            if board[i][j] != 0:
-                print("Board position taken.")
-            elif x in allowedMoves:
-                board[i][j] = x
-                movesList.append([i,j])
+            message = None
+            if session.taken(i, j):
+                message = "Board position taken."
+            elif session.allowed(i, j, x):
+                session.place(i, j, x)
             else:
-                print("The value {} is not allowed.".format(str(x)))
-            printBoard(board)
+                message = "The value {} is not allowed.".format(str(x))
+            renderer.draw(session.board)
+            if message is not None:
+                renderer.message(message)
 
         # Undo Last Move
         elif (userInput[0] == 'u' or userInput[0] == 'undo'):
-            if len(movesList) > 0:
-                undoRef = movesList.pop()
-                board[undoRef[0]][undoRef[1]] = 0
-                printBoard(board)
+            if session.undo():
+                renderer.draw(session.board)
             else:
-                print("No more moves to  undo")
+                renderer.message("No more moves to  undo")
 
         # Provide Hint
         elif (userInput[0] == 'h' or userInput[0] == 'hint'):
-            hintRow, hintCol = hint(board)
-            hintCopy = copy.deepcopy(board)
+            hintRow, hintCol = session.hint()
+            hintCopy = session.board.toGrid()
             hintCopy[hintRow][hintCol] = "*"
-            printBoard(hintCopy)
-            print("({}, {})".format(hintRow, hintCol))
+            renderer.draw(hintCopy)
+            renderer.message("({}, {})".format(hintRow, hintCol))
 
         # Solve Board
         elif (userInput[0] == 's' or userInput[0] == 'solve'):
-            board = solve(board, 1)
-            printBoard(board)
+            session = GameSession(solve(session.board, 1, timer = printRunTime))
+            renderer.draw(session.board)
 
         # New Board
         elif userInput[0] == 'n' or userInput[0] == 'new':
             boardSize = getBoardSize()
-            board = generate(boardSize)
-            boardCopy = copy.deepcopy(board)
-            printBoard(board)
+            session = GameSession(newBoard(boardSize, bank, prefetcher))
+            renderer.invalidate()
+            renderer.draw(session.board)
 
         # Help / Display Options
         elif userInput[0] == 'help':
             printOptions()
+            renderer.invalidate()
 
         # Quit Game
         elif userInput[0] == 'q' or userInput[0] == 'quit':
@@ -86,575 +149,1174 @@ def play(board):
 
         # Restart Chosen Board
         elif userInput[0] == 'r' or userInput[0] == 'restart':
-            board = boardCopy
-            boardCopy = copy.deepcopy(board) # Deepcopy For Restart
-            movesList = [] # Reset Moves List
-            printBoard(board)
+            session.restart()
+            renderer.draw(session.board)
 
         else:
-            print('Invalid input')
+            renderer.message('Invalid input')
 
         # Check For Board Completion
-        if checkBoardCompleted(board):
-            print("\nCongratulations you have solved the Sudoku!")
+        if session.completed():
+            renderer.message("\nCongratulations you have solved the Sudoku!")
             return 0
 
+def parseMove(text, n):
+    """
+    Read a move typed as 'row col value' for an n by n board.  Row and col are numbers (any
+    number of digits); the value is a number or its board symbol (10 = 'A', see SYMBOLS).
+
+    Args:
+        text (str): the move as typed
+        n (int): board width
+
+    Returns:
+        tuple: (row, col, value); None if text is not a move
+    """
+    parts = text.split()
+    if len(parts) != 3 or not parts[0].isdecimal() or not parts[1].isdecimal():
+        return None
+    if parts[2].isdecimal():
+        x = int(parts[2])
+    else:
+        x = symbolValue(parts[2], n)
+        if x is None:
+            return None
+    return int(parts[0]), int(parts[1]), x
+
+class GameSession:
+    """
+    Running state of one board played with play()
+
+    Keeps the candidate tracking for the board, the number of options left at every empty
+    position and the empty positions grouped by that number.  A move or undo only recounts the
+    options of the changed position and its peers, so checking a move and detecting completion
+    take constant time, and a hint is read from the smallest non-empty group instead of
+    rescanning the board.  Moves are recorded on the candidate trail, so undo and restart roll
+    the board back rather than rebuilding it.
+
+    Args:
+        board (Board or int array): sudoku board to play, copied
+    """
+
+    def __init__(self, board):
+        self.cands = Candidates(Board.fromGrid(board))
+        self.board = self.cands.board
+        self.n = self.cands.n
+        self.start = self.cands.mark()
+        self.peers = boardTables(self.n)[3]
+        self.optionCounts = [0] * (self.n * self.n)
+        self.byOptionCount = [set() for count in range(self.n + 1)]
+        for c in range(self.n * self.n):
+            self.recount(c)
+
+    def recount(self, c):
+        """
+        Update the option count of cell c (cell c is at row c // n, col c % n)
+        """
+        self.byOptionCount[self.optionCounts[c]].discard(c)
+        if self.board.cells[c] == 0:
+            count = self.cands.mask(c // self.n, c % self.n).bit_count()
+            self.optionCounts[c] = count
+            self.byOptionCount[count].add(c)
+
+    def changed(self, i, j):
+        """
+        Recount the options at position i, j and at each of its peers after it changed
+        """
+        c = i * self.n + j
+        self.recount(c)
+        for p in self.peers[c]:
+            self.recount(p)
+
+    def taken(self, i, j):
+        """
+        True if position i, j is on the board and already holds a value
+        """
+        return 0 <= i < self.n and 0 <= j < self.n and self.board[i, j] != 0
+
+    def allowed(self, i, j, x):
+        """
+        True if value x can be played at empty position i, j
+        """
+        if not (0 <= i < self.n and 0 <= j < self.n and 1 <= x <= self.n):
+            return False
+        return self.board[i, j] == 0 and self.cands.mask(i, j) & (1 << (x - 1)) != 0
+
+    def place(self, i, j, x):
+        """
+        Play value x at position i, j (check allowed() first)
+        """
+        self.cands.place(i, j, x)
+        self.changed(i, j)
+
+    def undo(self):
+        """
+        Take back the last move
+
+        Returns:
+            bool: False if there was no move to undo
+        """
+        mark = self.cands.mark()
+        if mark == self.start:
+            return False
+        i, j = self.cands.trail[-1]
+        self.cands.undo(mark - 1)
+        self.changed(i, j)
+        return True
+
+    def restart(self):
+        """
+        Take back every move, back to the starting board
+        """
+        while self.undo():
+            pass
+
+    def hint(self):
+        """
+        Row and col of the empty position with the fewest options (the first, row by row, of
+        those tied)
+
+        Returns:
+            int: row and col position to play next; None, None if the board is completed
+        """
+        for cells in self.byOptionCount:
+            if cells:
+                c = min(cells)
+                return c // self.n, c % self.n
+        return None, None
+
+    def completed(self):
+        """
+        True if every position on the board holds a value
+        """
+        return self.cands.empty == 0
+
 def printBoard(board):
     """
-    Print board with aligned rows and columns
+    Print board with aligned rows and columns, one symbol per cell (see SYMBOLS).  A cell holding
+    a string (such as the hint marker '*') is printed as it is.  The whole board is written in a
+    single call.
 
     Args:
         board (int array): sudoku board
     """
-    length = int(len(board[0]))
-    k = int(length**.5)
-    rowLength = int(length + k +1)
-    print("-" * rowLength)
-    for row1 in range(k):
-        for row2 in range(k):
-            rowRef = int(((row1 * k) + row2))
-            print("|", end='')
-            for col1 in range(k):
-                for col2 in range(k):
-                    colRef = int(((col1 * k) + col2))
-                    if board[rowRef][colRef] == 0:
-                        print(" ", end='')
-                    elif board[rowRef][colRef] == 10:
-                        print("A", end='')
-                    elif board[rowRef][colRef] == 11:
-                        print("B", end='')
-                    elif board[rowRef][colRef] == 12:
-                        print("C", end='')
-                    elif board[rowRef][colRef] == 13:
-                        print("D", end='')
-                    elif board[rowRef][colRef] == 14:
-                        print("E", end='')
-                    elif board[rowRef][colRef] == 15:
-                        print("F", end='')
-                    elif board[rowRef][colRef] == 16:
-                        print("G", end='')
-                    else:
-                        print(board[rowRef][colRef], end='')
-                print("|", end='')
-            print("")
-        print("-" * rowLength)
-
-def generate(k):
-    """
-    Generate a new random board
+    sys.stdout.write(renderBoard(board))
+    sys.stdout.flush()
+
+def renderBoard(board):
+    """
+    Board drawn as printBoard() shows it, from the cached frame template for its size
 
     Args:
-        k (int): size of board k**2 by k**2.  If k = 2, the board is 4 x 4
+        board (int array): sudoku board
 
     Returns:
-        int array: A random, uniquely solvable k**2 by k**2 board
-    """
-
-    if k == 2:
-        print("Generating board... (this may take a while)")
-    elif k > 2:
-        print("Generating board... (this may take a very long time)")
-
-    n = k**2
-
-    # Generate a New Completed Board
-    board = createEmptyBoard(k)
-    board = generateRandom(board)[0]
-
-    # Remove First n Values From Random Positions
-    numbers = []
-    for i in range(1,n + 1):
-        numbers.append(i)
-    randRow = 0
-    randCol = 0
-    numberToRemove = 0
-    while len(numbers) > 0:
-        randRow =  random.randrange(0, n)
-        randCol =  random.randrange(0, n)
-        numberToRemove = board[randRow][randCol]
-        if numberToRemove in numbers:
-            board[randRow][randCol] = 0
-            numbers.pop(numbers.index(numberToRemove))
-
-    # Remove Random Values Until Unique Solution Found
-    uniqueBoard = []
-    while len(backtrack(board, 2)) < 2:
-        uniqueBoard = copy.deepcopy(board)
-        nextIteration = False
-        while nextIteration == False:
-            randRow = random.randrange(0, n)
-            randCol = random.randrange(0, n)
-            if board[randRow][randCol] != 0:
-                board[randRow][randCol] = 0
-                nextIteration = True
-    return uniqueBoard
+        str: the board, one line per row and sub grid separator
+    """
+    return frameTemplate(len(board)).format(*boardSymbols(board))
+
+def boardSymbols(board):
+    """
+    Symbol shown for each cell of a board, row by row (' ' for an empty cell)
+    """
+    n, cells = boardCells(board)
+    symbols = CELL_SYMBOLS
+    return [x if isinstance(x, str) else symbols[x] for x in cells]
+
+def frameTemplate(n):
+    """
+    Format string drawing an n by n board, with a '{}' field for each cell, built once per size
+    """
+    if n not in FRAME_TEMPLATES:
+        k = math.isqrt(n)
+        separator = "-" * (n + k + 1) + "\n"
+        row = "|" + "|".join(["{}" * k] * k) + "|\n"
+        FRAME_TEMPLATES[n] = separator + separator.join([row * k] * k) + separator
+    return FRAME_TEMPLATES[n]
+
+FRAME_TEMPLATES = {}
+
+class BoardRenderer:
+    """
+    Draws the board for play(), each frame written with a single call
+
+    In redraw mode (for terminals with ANSI cursor movement) the board is drawn once at the top
+    of a cleared screen; later frames only move the cursor to each cell that changed and rewrite
+    it, then clear the lines below the board for the prompt, so a move sends a few bytes rather
+    than the whole board.  Without redraw each frame is printed in full, as printBoard() does.
+
+    Args:
+        redraw (bool, optional): only redraw the cells that changed. Defaults to False.
+        stream (file, optional): where to draw. Defaults to sys.stdout.
+    """
+
+    def __init__(self, redraw = False, stream = None):
+        self.redraw = redraw
+        self.stream = stream
+        self.shown = None
+        self.height = 0
+
+    def draw(self, board):
+        """
+        Draw board (a cell holding a string, such as the hint marker '*', is drawn as it is)
+        """
+        stream = self.stream or sys.stdout
+        symbols = boardSymbols(board)
+        n = len(board)
+        if not self.redraw:
+            frame = frameTemplate(n).format(*symbols)
+        elif self.shown is None or len(self.shown) != len(symbols):
+            frame = "\x1b[H\x1b[2J" + frameTemplate(n).format(*symbols)
+        else:
+            # Rows And Cols Are Offset By The Separators Before Them (ANSI Positions Count From 1)
+            k = math.isqrt(n)
+            parts = []
+            for c, symbol in enumerate(symbols):
+                if symbol != self.shown[c]:
+                    i, j = divmod(c, n)
+                    parts.append("\x1b[{};{}H{}".format(i + i // k + 2, j + j // k + 2, symbol))
+            parts.append("\x1b[{};1H\x1b[J".format(self.height + 1))
+            frame = "".join(parts)
+        if self.redraw:
+            self.shown = symbols
+            self.height = n + math.isqrt(n) + 1
+        stream.write(frame)
+        stream.flush()
+
+    def message(self, text):
+        """
+        Show a line of text below the board (in redraw mode, replacing what was there)
+        """
+        stream = self.stream or sys.stdout
+        if self.redraw and self.shown is not None:
+            text = "\x1b[{};1H\x1b[J".format(self.height + 1) + text
+        stream.write(text + "\n")
+        stream.flush()
+
+    def invalidate(self):
+        """
+        Draw the next board in full, after other output may have scrolled the screen
+        """
+        self.shown = None
 
 def getBoardSize():
     """
-    Prompt user to input the size of the board either small, normal or big
+    Prompt user to input the size of the board either small, normal, big or huge, or a board
+    width such as '36' or '36x36' (a square number up to MAX_WIDTH)
 
     Returns:
         int: The size (k) of the board.  Eg if k = 2 we have a 2**2 board (4 x 4)
              k is the size of each subarray within the board
     """
     while(True):
-        size = input("Choose board size ('small' 4x4 | 'normal' 9x9 | 'big' 16x16): ").strip().lower()
+        size = input("Choose board size ('small' 4x4 | 'normal' 9x9 | 'big' 16x16 | 'huge' 25x25): ").strip().lower()
         if size == "small":
             return 2
         elif size == "normal":
             return 3
         elif size == "big":
             return 4
+        elif size == "huge":
+            return 5
+        elif size.split("x")[0].isdecimal():
+            width = int(size.split("x")[0])
+            k = math.isqrt(width)
+            if k >= 2 and k * k == width and width <= MAX_WIDTH:
+                return k
 
-
-def createEmptyBoard(k):
+def printOptions():
     """
-    Create a k**2 by k**2 Board
-
-    Args:
-        k (int): size of board k**2.  Ie if k = 2 the board is 4 x 4
-
-    Returns:
-        int array: empty k**2 by k**2 array
+    Print valid user input list for playing the game
     """
-    n = k**2
-    board = []
-    for i in range(n):
-        board.append([0] * n)
-    return board
+    print("\n~ Sudoku Command Line Game ~")
+    print("Inputs:")
+    print("'rol col value' - place a value on the board.  Eg '3 2 6' will place 6 at row 3, col 2.")
+    print(" - Note that indexing is zero based")
+    print(" - Values above 9 may be typed as numbers or as shown on the board.  Eg '0 4 12' or '0 4 C'.")
+    print("'undo' or 'u' - undo your last move.")
+    print("'hint' or 'h' - an asterisk will be displayed at the easiest location for your next play.")
+    print("'solve' or 's' - the board will solved and displayed.")
+    print("'new' or 'n' - generate a new board.")
+    print("'help' or 'h' - display valid input options.")
+    print("'restart' or 'r' - restart the board from the beginning.")
+    print("'quit' or 'q' - quit the game.")
 
-def generateRandom(board):
+def printRunTime(totalTime):
     """
-    Generate a ramdomised board
+    Print a solve time, as the timer of solve()
 
     Args:
-        board (int array): empty sudoku board
+        totalTime (float): seconds taken
+    """
+    min = int(totalTime // 60)
+    sec = totalTime % 60
+    sec = round(sec % 60, 3)
+    print("Run time: {} min {} secs".format(min, sec))
 
-    Returns:
-        int array: randomised board
+# Cell Symbols As Printed On The Board
+CELL_SYMBOLS = " " + SYMBOLS[1:]
+
+def generateJob(job):
     """
-    board = inferred(board)
-    if checkBoardCompleted(board):
-        return [board]
-    else:
-        boardList = []
-        row, col = randomPosition(board)
-        optionsList = options(board, row, col)
-        random.shuffle(optionsList)
-        for option in optionsList:
-            board[row][col] = option
-            boardCopy = copy.deepcopy(board)
-            boardList += generateRandom(boardCopy)
-            if len(boardList) > 0 and checkBoardCompleted(boardList[0]):
-                return boardList
-        return boardList
-
-def randomPosition(board):
-    """
-    Find an empty position on the board
+    Generate one board for generateBatch(), seeding the generator from the job so the board only
+    depends on the batch seed and its index
 
     Args:
-        board (int array): sudoku board
+        job (tuple): (k, seed, index, symmetry, difficulty)
 
     Returns:
-        int: a random row and col position representing an empty position
+        str: the generated board encoded by boardToLine()
     """
-    n = len(board[0])
-    emptyPositions = []
-    for row in range(n):
-        for col in range(n):
-            if board[row][col] == 0:
-                emptyPositions.append([row,col])
-    returnValues = emptyPositions[random.randint(0, len(emptyPositions)-1)]
-    return returnValues[0], returnValues[1]
+    k, seed, index, symmetry, difficulty = job
+    random.seed("{}:{}:{}".format(seed, k, index))
+    return boardToLine(generate(k, symmetry = symmetry, difficulty = difficulty))
 
-def hint(board):
+def generateBatch(k, count, output, workers = None, seed = None, symmetry = "none", difficulty = "any"):
     """
-    Find the row, col position that is best to play next based on finding the location
-    with the lowest number of potential values that can be played at each empty location
+    Generate count boards across a pool of worker processes, writing each board to output as a
+    line as soon as it and every board before it are done
+
+    Board i is generated from (seed, k, i), so the same seed always gives the same file whatever
+    the number of workers.  If output already holds finished boards, generation resumes after
+    them (a partly written last line is dropped), so a stopped run loses no finished work.  An
+    output ending in ARCHIVE_SUFFIX is written as a binary archive (see sudoku_archive) instead.
 
     Args:
-        board (int array): sudoku board
+        k (int): size of board k**2 by k**2
+        count (int): total number of boards wanted in output
+        output (str): file to append boards to, or '-' for stdout (no resuming)
+        workers (int, optional): number of worker processes. Defaults to the number of CPUs.
+        seed (str, optional): batch seed. Defaults to a random seed, which is reported.
+        symmetry (str, optional): pattern of removed positions, one of SYMMETRIES. Defaults to "none".
+        difficulty (str, optional): difficulty of every board, one of DIFFICULTIES or "any".
+                                    Defaults to "any".
 
     Returns:
-        int: row and col location that is best to play next (least number of potential options)
+        int: the number of boards generated by this call
     """
-    rowRef = 0
-    colRef = 0
-    minOptions = len(board)
-    if checkBoardCompleted(board):
-        return None, None
+    if seed is None:
+        seed = str(random.SystemRandom().randrange(2**32))
+        print("Seed: {}".format(seed), file = sys.stderr)
+
+    from sudoku_archive import ARCHIVE_SUFFIX, ArchiveWriter
+
+    # Resume After The Complete Lines (Or Archive Records) Already Written
+    done = 0
+    outFile = archive = None
+    if output == "-":
+        outFile = sys.stdout
+    elif output.endswith(ARCHIVE_SUFFIX):
+        archive = ArchiveWriter(output, difficulty = True, k = k, resume = True)
+        done = archive.count
     else:
-        for i in range(len(board)):
-            for j in range(len(board[i])):
-                if board[i][j] == 0:
-                    if len(options(board, i, j)) < minOptions:
-                        minOptions = len(options(board, i, j))
-                        rowRef = i
-                        colRef = j
-        return rowRef, colRef
-
-def options(board, i, j):
+        if os.path.exists(output):
+            with open(output, "rb+") as existing:
+                data = existing.read()
+                complete = data.rfind(b"\n") + 1
+                existing.truncate(complete)
+                done = data.count(b"\n", 0, complete)
+        outFile = open(output, "a")
+
+    jobs = ((k, seed, index, symmetry, difficulty) for index in range(done, count))
+    generated = 0
+    pool = None
+    try:
+        if workers == 1:
+            lines = map(generateJob, jobs)
+        else:
+            import multiprocessing
+            pool = multiprocessing.Pool(workers)
+            lines = pool.imap(generateJob, jobs)
+        for line in lines:
+            if archive is not None:
+                archive.add(lineToBoard(line), difficulty = difficulty)
+                archive.flush()
+            else:
+                outFile.write(line + "\n")
+                outFile.flush()
+            generated += 1
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if archive is not None:
+            archive.close()
+        elif outFile is not sys.stdout:
+            outFile.close()
+    return generated
+
+class PuzzleBank:
     """
-    Generate a list of valid values that can be played at a specified i, j position
+    Store of generated puzzles in an SQLite database, by board size and difficulty
 
-    Args:
-        board (int array): sudoku board
-        i (int): row position
-        j (int): col position
+    Puzzles are indexed by (k, difficulty, id), so take() finds and removes one with a single
+    index lookup however many are stored.  Puzzles are generated at random, so the oldest is as
+    random as any other.  refill() tops a running low bank back up from a background worker
+    process, so new games can be served at once while the next puzzles are generated.
 
-    Returns:
-        int array: list of possible valid values that can be placed at position i, j
+    Args:
+        path (str): database file, created if missing
+        low (int, optional): refill() starts a worker once fewer puzzles than this are left.
+                             Defaults to 3.
+        target (int, optional): number of puzzles a refill worker fills up to. Defaults to 10.
     """
-    allowedValues = []
-    allCurrentValues = subgridValues(board, i, j)
-    rowColList = colRowValues(board, i, j)
-    for i in rowColList:
-        if i not in allCurrentValues:
-            allCurrentValues.extend([i])
-    for i in range(1, len(board) + 1):
-        if i not in allCurrentValues:
-            allowedValues.append(i)
-    return allowedValues
 
-def subgridValues(board, row, col):
+    def __init__(self, path, low = 3, target = 10):
+        self.path = path
+        self.low = low
+        self.target = target
+        self.refillers = {}
+        import sqlite3
+        self.db = sqlite3.connect(path, timeout = 30)
+        self.db.execute("CREATE TABLE IF NOT EXISTS puzzles "
+                        "(id INTEGER PRIMARY KEY, k INTEGER, difficulty TEXT, board TEXT)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS puzzlesBySize ON puzzles (k, difficulty, id)")
+        self.db.commit()
+
+    def add(self, k, lines, difficulty = "any"):
+        """
+        Store puzzles encoded by boardToLine()
+        """
+        self.db.executemany("INSERT INTO puzzles (k, difficulty, board) VALUES (?, ?, ?)",
+                            [(k, difficulty, line) for line in lines])
+        self.db.commit()
+
+    def count(self, k, difficulty = "any"):
+        """
+        Number of puzzles stored for size k and difficulty
+        """
+        return self.db.execute("SELECT COUNT(*) FROM puzzles WHERE k = ? AND difficulty = ?",
+                               (k, difficulty)).fetchone()[0]
+
+    def take(self, k, difficulty = "any"):
+        """
+        Remove and return a stored puzzle
+
+        Returns:
+            int array: sudoku board; None if the bank has none for size k and difficulty
+        """
+        while True:
+            row = self.db.execute("SELECT id, board FROM puzzles WHERE k = ? AND difficulty = ? "
+                                  "ORDER BY id LIMIT 1", (k, difficulty)).fetchone()
+            if row is None:
+                return None
+            deleted = self.db.execute("DELETE FROM puzzles WHERE id = ?", (row[0],)).rowcount
+            self.db.commit()
+            # Another Process May Have Taken It First
+            if deleted:
+                return lineToBoard(row[1])
+
+    def refill(self, k, difficulty = "any"):
+        """
+        Start a background process filling the bank up to target puzzles for size k and
+        difficulty, if fewer than low are left and no refill for them is running
+
+        Returns:
+            multiprocessing.Process: the refill worker, or None if none is needed
+        """
+        worker = self.refillers.get((k, difficulty))
+        if worker is not None and worker.is_alive():
+            return worker
+        if self.count(k, difficulty) >= self.low:
+            return None
+        import multiprocessing
+        worker = multiprocessing.Process(target = fillBank, args = (self.path, k, self.target, difficulty),
+                                         daemon = True)
+        worker.start()
+        self.refillers[(k, difficulty)] = worker
+        return worker
+
+    def close(self):
+        """
+        Close the database.  Refill workers keep running until they finish or the program exits.
+        """
+        self.db.close()
+
+def fillBank(path, k, target, difficulty = "any"):
     """
-    Generate a list of values within a sub grid of the board
+    Generate puzzles into the bank at path until it holds target for size k and difficulty.
+    Each puzzle is stored as soon as it is generated, so a stopped fill loses no finished work.
 
     Args:
-        board (int array): sudoku board
-        row (int): row position to find the sub array
-        col (int): col position to find the sub array
+        path (str): bank database file
+        k (int): size of board k**2 by k**2
+        target (int): number of puzzles wanted in the bank
+        difficulty (str, optional): difficulty of the puzzles, one of DIFFICULTIES or "any".
+                                    Defaults to "any".
 
     Returns:
-        int array: list of values within the sub array
-    """
-    length = int(len(board[0]))
-    subgridLen = int(length**.5)
-    row1 = int(row // subgridLen)
-    col1 = int(col // subgridLen)
-    valuesList = []
-    for row2 in range(subgridLen):
-        rowRef = int(((row1 * subgridLen) + row2))
-        for col2 in range(subgridLen):
-            colRef = int(((col1 * subgridLen) + col2))
-            num = int((board[rowRef][colRef]))
-            if num != 0:
-                valuesList.append(num)
-    return valuesList
-
-def colRowValues(board, row, col):
-    """
-    Generate a list of values on a board for a specified row and column
+        int: the number of puzzles added
+    """
+    if difficulty != "any" and difficulty not in DIFFICULTIES:
+        raise ValueError("Unknown difficulty '{}'".format(difficulty))
+
+    # Worker Processes Inherit The Random State, So Reseed
+    random.seed()
+    bank = PuzzleBank(path)
+    added = 0
+    try:
+        while bank.count(k, difficulty) < target:
+            bank.add(k, [boardToLine(generate(k, difficulty = difficulty))], difficulty)
+            added += 1
+    finally:
+        bank.close()
+    return added
+
+def newBoard(k, bank = None, prefetcher = None):
+    """
+    Board for a new game: taken from the puzzle bank if it has one (starting a refill when it
+    runs low), else the board prefetched for size k, else generated.  The prefetcher then starts
+    on the board after it.
 
     Args:
-        board (int array): sudoku board
-        row (int): row position to find the board values
-        col (int): col position to find the board values
+        k (int): size of board k**2 by k**2
+        bank (PuzzleBank, optional): bank to serve the board from. Defaults to None.
+        prefetcher (BoardPrefetcher, optional): background generation of the next board.
+                                                Defaults to None.
 
     Returns:
-        int array: list of values on the board along a given row and col
+        int array: sudoku board
     """
-    rowColValues = []
-    for i in range(len(board)):
-        if board[row][i] != 0:
-            rowColValues.append(board[row][i])
-        if board[i][col] != 0:
-            rowColValues.append(board[i][col])
-    return rowColValues
+    board = None
+    if bank is not None:
+        board = bank.take(k)
+        bank.refill(k)
+    if board is None and prefetcher is not None:
+        board = prefetcher.take(k)
+    if board is None:
+        board = generate(k, log = print)
+    if prefetcher is not None:
+        prefetcher.start(k)
+    return board
 
-def checkBoardCompleted(board):
+class BoardPrefetcher:
     """
-    Check if the board is completed / solved
+    Generates the next board in a background process while the player is busy, so a new game
+    of the same size is ready at once
 
-    Args:
-        board (int array): sudoku board
+    A board still being generated when it is asked for is waited for rather than started again.
+    Asking for a different size cancels it.
+    """
 
-    Returns:
-        bool: True if board is solved; False otherwise
+    def __init__(self):
+        self.k = None
+        self.process = None
+        self.results = None
+
+    def start(self, k):
+        """
+        Start generating a board of size k, unless one is already on its way
+        """
+        if self.process is not None and self.k == k:
+            return
+        self.cancel()
+        self.k = k
+        import multiprocessing
+        self.results = multiprocessing.Queue(1)
+        self.process = multiprocessing.Process(target = prefetchJob, args = (k, self.results), daemon = True)
+        self.process.start()
+
+    def take(self, k):
+        """
+        The prefetched board, waiting for it to finish if needed
+
+        Returns:
+            int array: sudoku board; None if no board of size k was being prefetched (any other
+            prefetch is cancelled)
+        """
+        if self.process is None or self.k != k:
+            self.cancel()
+            return None
+        import queue
+        line = None
+        while line is None:
+            try:
+                line = self.results.get(timeout = 0.1)
+            except queue.Empty:
+                if not self.process.is_alive() and self.results.empty():
+                    break
+        self.process.join()
+        self.process = None
+        self.k = None
+        return lineToBoard(line) if line is not None else None
+
+    def cancel(self):
+        """
+        Stop any board being prefetched
+        """
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+        self.process = None
+        self.k = None
+
+def prefetchJob(k, results):
+    """
+    Generate one board for BoardPrefetcher and put it on the results queue, encoded by boardToLine()
     """
-    for i in range(len(board)):
-        for j in range(len(board)):
-            if board[i][j] == 0:
-                return False
-    return True
+    # Worker Processes Inherit The Random State, So Reseed
+    random.seed()
+    results.put(boardToLine(generate(k)))
+
+# Default Puzzle Bank For The Interactive Game
+BANK_PATH = os.path.join(os.path.expanduser("~"), ".clidoku_bank.sqlite")
 
-def solve(board, solutions = 1):
+def solveJob(job):
     """
-    Solve sudoku board via backtracking (calls backtracking function)
-    Times solve time for benchmarking
+    Solve a chunk of encoded boards for solveBatch()
 
     Args:
-        board (int array): sudoku board to solve
-        solutions (int, optional): Only return solutions number of solved boards. Defaults to 1.
+        job (tuple): (lines, engine, cached) - board lines to solve, the solver engine to use and
+                     whether to solve through the solution cache of this process (see batchCache())
 
     Returns:
-        int array: solved sudoku board
+        tuple: (results, hits, lookups) - one result per board; the solved board line (or 'none'
+        if it has no solution, found without a search if a clue is repeated, 'invalid' if it
+        cannot be read) and the solve time in seconds, separated by a tab; and the cache hits and
+        lookups made for the chunk
     """
-    startTime = timeit.default_timer()
-    board = backtrack(board, solutions)
-
-    endTime = timeit.default_timer()
-    totalTime = endTime - startTime
-    min = int(totalTime // 60)
-    sec = totalTime % 60
-    sec = round(sec % 60, 3)
-    print("Run time: {} min {} secs".format(min, sec))
-
-    return board[0]
+    lines, engine, cached = job
+    if engine == "numpy":
+        return numpySolveJob(lines), 0, 0
+    cache = batchCache() if cached else None
+    hits = cache.hits if cached else 0
+    misses = cache.misses if cached else 0
+    results = []
+    for line in lines:
+        startTime = timeit.default_timer()
+        try:
+            board = lineToBoard(line)
+        except ValueError:
+            results.append("invalid\t0")
+            continue
+        # Repeated Clues Leave No Solution, Without Searching For One
+        if not cluesConsistent(Candidates(Board.fromGrid(board))):
+            solved = []
+        elif cached:
+            solved = cache.solve(board, 1, engine)
+        else:
+            solved = SOLVER_ENGINES[engine](board, 1)
+        totalTime = timeit.default_timer() - startTime
+        results.append("{}\t{:.6f}".format(boardToLine(solved[0]) if solved else "none", totalTime))
+    if cached:
+        hits, misses = cache.hits - hits, cache.misses - misses
+    return results, hits, hits + misses
+
+def batchCache():
+    """
+    Get the solution cache of this process for solveJob(), made on first use and kept across
+    chunks so a board equivalent to one solved earlier in the batch is answered from it
 
-def backtrack(board, solutions = 1):
+    Returns:
+        SolutionCache: the cache of this process
     """
-    Solve a sudoku board via backtracking
+    global BATCH_CACHE
+    if BATCH_CACHE is None:
+        BATCH_CACHE = SolutionCache(BATCH_CACHE_CAPACITY)
+    return BATCH_CACHE
 
-    Inference
-    Use inference to solve board as much as possible until "stuck"; then make a single "smart guess";
-    and again, infer as much as possible.  This approach replicates actual human behavior in solving
-    Sudoku and substantially reduces computational complexity, enabling solving the larger / more
-    complex boards in reasonable time.  Inference requires no recursion/backtracking to implement and
-    thus is highly efficient, especially where we may traverse long "dead end" recursive branches for
-    the larger and more difficult boards.
+# Solution Cache Of This Process, Made By batchCache() And Kept In Memory Only
+BATCH_CACHE = None
+BATCH_CACHE_CAPACITY = 65536
 
-    Backtracking
-    Base case is a solved board added to results list.
-    For backtracking, select the first empty (zero-value) cell and obtain the list of valid options.
-    Then recursively iterate over these options until reaching base-case and return the solved board
-    to results list.
+def numpySolveJob(lines):
+    """
+    Solve a chunk of encoded boards for solveBatch() as NumPy batches, one per board size.  Each
+    board is reported with the mean solve time of its batch.
 
     Args:
-        board (int array): current state of the sudoku board
-        solutions (int, optional): Only return solutions number of solved boards. Defaults to 1.
+        lines (str array): board lines to solve
 
     Returns:
-        int array (array of solved boards): solved sudoku boards
+        str array: one result per board, as for solveJob()
     """
-    board = inferred(board)
-    if checkBoardCompleted(board):
-        return [board]
-    else:
-        res = []
-        row, col = quickHint(board)
-        for o in options(board, row, col):
-            board[row][col] = o
-            boardCopy = copy.deepcopy(board)
-            if len(res) < solutions: # Only return "solutions" number of solved boards
-                res += backtrack(boardCopy)
-        return res
-
-def quickHint(board):
+    import sudoku_numpy
+    results = ["invalid\t0"] * len(lines)
+    bySize = {}
+    for index, line in enumerate(lines):
+        try:
+            board = lineToBoard(line)
+        except ValueError:
+            continue
+        if not cluesConsistent(Candidates(Board.fromGrid(board))):
+            results[index] = "none\t0"
+            continue
+        bySize.setdefault(len(board), []).append((index, board))
+    for batch in bySize.values():
+        startTime = timeit.default_timer()
+        solved = sudoku_numpy.numpySolveBatch([board for index, board in batch], 1)
+        meanTime = (timeit.default_timer() - startTime) / len(batch)
+        for (index, board), boardSolutions in zip(batch, solved):
+            results[index] = "{}\t{:.6f}".format(boardToLine(boardSolutions[0]) if boardSolutions else "none",
+                                                 meanTime)
+    return results
+
+def readBoardLines(lines):
     """
-    Quickly find the best position for a hint based on the heuristic that the row or col
-    with the lowest number of empty values would be the best place for the next guess
+    Stream the board fields from lines of text, skipping blank and '#' comment lines.  Only the
+    first field of each line is kept, so 'puzzle,solution' CSV lines give the puzzle.
 
     Args:
-        board (int array): sudoku board
+        lines (iterable): lines of text, read lazily
 
-    Returns:
-        int: row and col position with the highest count (lowest empty positions)
+    Yields:
+        str: one encoded board per line
     """
-    n = len(board[0])
-    rowCount=[0]*n
-    colCount=[0]*n
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line.replace(",", " ").split()[0]
 
-    # Count Values in Rows and Cols
-    for i in range(n):
-        for j in range(n):
-            if board[i][j]  != 0:
-                rowCount[i] += 1
-                colCount[j] += 1
-
-    # Find Max
-    maxValue = 0
-    maxRow = None
-    maxCol = None
-    for i in range(n):
-        for j in range(n):
-            if board[i][j] == 0:
-                if rowCount[i] + colCount[j] > maxValue:
-                    maxValue = rowCount[i] + colCount[j]
-                    maxRow = i
-                    maxCol = j
+def chunked(items, size):
+    """
+    Group an iterable into lists of up to size items, read lazily
 
-    return maxRow, maxCol
+    Yields:
+        list: the next size items
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def poolMap(pool, function, jobs, window):
+    """
+    Like pool.imap(), but only keeps window jobs in flight so jobs are read from the iterable as
+    results are used rather than all at once
 
-def inferred(board):
+    Yields:
+        the result of function for each job, in job order
+    """
+    pending = collections.deque()
+    for job in jobs:
+        pending.append(pool.apply_async(function, (job,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+def solveBatch(lines, outFile, workers = 1, engine = "backtrack", chunkSize = 64, archive = None, cache = False,
+               stats = None):
     """
-    Check each non-solved position and attempt to solved via "Forward Single" or "Backward Single" methods
+    Solve every board in lines, writing one result line per board to outFile as it goes
+
+    Boards are streamed through a generator pipeline, so the input is never held in memory.  With
+    more than one worker, chunks of boards are solved in a process pool while the results are
+    still written in input order.
 
     Args:
-        board (int array): sudoku board to solve
+        lines (iterable): lines of text holding the boards (see readBoardLines())
+        outFile (file): where results are written (see solveJob())
+        workers (int, optional): number of worker processes. Defaults to 1 (no pool).
+        engine (str, optional): solver engine, one of SOLVER_ENGINES. Defaults to "backtrack".
+        chunkSize (int, optional): boards sent to a worker at a time. Defaults to 64.
+        archive (ArchiveWriter, optional): archive with solutions to store each readable board
+                                           and its solution in instead of writing to outFile.
+                                           Defaults to None.
+        cache (bool, optional): solve through a solution cache in each process, so boards
+                                equivalent to one already solved (see canonicalForm()) are not
+                                searched again. Not used by the numpy engine. Defaults to False.
+        stats (dict, optional): filled with "cacheHits" and "cacheLookups" counts. Defaults to None.
 
     Returns:
-        int array: new Sudoku board with all values field from input board plus all values that can be
-        inferred by repeated application of forward and backward single rule
-    """
-    inferCopy = copy.deepcopy(board)
-    improved = True
-    while improved == True:
-        improved = False
-        for i in range(len(inferCopy)):
-            for j in range(len(inferCopy[i])):
-                if inferCopy[i][j] == 0:
-                    solution = valueBySingle(inferCopy, i, j)
-                    if solution  !=  None:
-                        inferCopy[i][j] = solution
-                        improved = True
-    return inferCopy
-
-def valueBySingle(board, i, j):
-    """
-    Check if position i, j can be solved by either "Forward Single" or "Backward Single" methods
-
-    Forward Single:  Find if a row, col or sub grid has only one value remaining
-    Backward Single: For the allowable options for a cell, find if, given the the row, col or sub
-                     grid allowable options, a value exists that can only be played at that cell
+        tuple: (boards read, boards solved)
+    """
+    if engine not in SOLVER_ENGINES:
+        raise ValueError("Unknown solver engine '{}'".format(engine))
+    if cache and engine == "numpy":
+        raise ValueError("The numpy engine solves boards in batches and cannot use the solution cache")
+    # Chunks In Flight, Kept To Pair Each Puzzle With Its Result For The Archive
+    chunks = collections.deque()
+    def chunkJobs():
+        for chunk in chunked(readBoardLines(lines), chunkSize):
+            if archive is not None:
+                chunks.append(chunk)
+            yield chunk, engine, cache
+    jobs = chunkJobs()
+    pool = None
+    total = 0
+    solved = 0
+    if stats is not None:
+        stats["cacheHits"] = stats["cacheLookups"] = 0
+    try:
+        if workers == 1:
+            results = map(solveJob, jobs)
+        else:
+            import multiprocessing
+            pool = multiprocessing.Pool(workers)
+            results = poolMap(pool, solveJob, jobs, 4 * (workers or os.cpu_count()))
+        for chunk, hits, lookups in results:
+            if stats is not None:
+                stats["cacheHits"] += hits
+                stats["cacheLookups"] += lookups
+            puzzles = chunks.popleft() if archive is not None else chunk
+            for puzzle, result in zip(puzzles, chunk):
+                if archive is None:
+                    outFile.write(result + "\n")
+                elif not result.startswith("invalid"):
+                    solution = result.split("\t")[0]
+                    archive.add(lineToBoard(puzzle), None if solution == "none" else lineToBoard(solution))
+                total += 1
+                if not result.startswith(("none", "invalid")):
+                    solved += 1
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return total, solved
+
+# Fixed Benchmark Corpus, Encoded By boardToLine()
+BENCHMARK_BOARDS = {
+    "4x4/easy": "13......3..4.4.1",
+    "4x4/hard": "...2....4.3.3...",
+    "4x4/pathological": "................",
+    "9x9/easy": "6.52..17...981...6..17.49...24.3..6...6.7258181....42....5.731..........4.......2",
+    "9x9/hard": "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "9x9/pathological": "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9",
+    "16x16/easy": "5..72D98GAB..3C49C6..GF5.2D.B781.1423CB6F75.A..G.38..E716.C4..D575.C..EAD43G1B2F4GA"
+                  "FD..B76E.5.39123DG9C..58.7..E68..5.3F91A24DGCF....B493G6DE..8.D59F1.38.7E..6B84C.E.G7"
+                  ".B253F.D.EG.865D4.9.C..2CB.81.6E.DG..5.72974...G.8F6..1.E.DG74..5.1.9.FA3A15....2E4...B6",
+    "16x16/hard": "C..EB..5......8A..7..4...F..E...9F....E....3....183D.GA.5.C.6..B.7F....1E...D.2.23.."
+                  ".EF4A.1..6G.E.1.5.D.......A8.C5.2...8BF...7.......8.93.....6..D5G.1...AC249.B.E3.C.72"
+                  ".6D..5..1....2.47.......G..D2B..6.............C.G5.4E.1...7....1...39..3.B....FD92.A...",
+    "16x16/pathological": "GC6.....9..1A5242.4.A..E......8....51D2.F..CG3....F8.6.............4..852CBF.9"
+                          ".....D2.B.8...5............ED.B.A3........69.4........F2AB.3.7CE......7C6.D.4..."
+                          ".A54.2G........F..C....E3.16...2.9E.2.9..6A..B.....5G..F4D..1..A.7..8.......G3..C."
+                          "F73...E.....2.G.",
+    "25x25/empty": "." * 625,
+}
+
+BENCHMARK_SEED = 2024
+
+def benchmarkCase(function, repeat):
+    """
+    Time function repeat times, then run it once more under tracemalloc for its peak memory.  The
+    random generator is seeded the same way before every run.
 
     Args:
-        board (int array): sudoku board
-        i (int): row position
-        j (int): column position
+        function (function): takes a stats dict (to count search nodes in) and runs the case
+        repeat (int): number of timed runs
 
     Returns:
-        int array: The correct value for field (i, j) in board if it can be inferred as either
-        a forward or a backward single; or None otherwise.
+        dict: min, median and p95 wall time in seconds, search nodes and peak memory in bytes
     """
-
-    # Check Forward Single
-    optionsList = options(board, i, j)
-    if len(optionsList) == 1:
-        return optionsList[0]
-
-    # If No Forward Single, Check Forward Backward
-
-    # Check Rows
-    rowOptions = optionsInRow(board, i, j)
-    for x in optionsList:
-        if x not in rowOptions:
-            return x
-
-    # Check Columns
-    colOptions = optionsInCol(board, i, j)
-    for x in optionsList:
-        if x not in colOptions:
-            return x
-
-    # Check Subgrid
-    subOptions = optionsInSubgrid(board, i, j)
-    for x in optionsList:
-        if x not in subOptions:
-            return x
-
-    return None
-
-def optionsInRow(board, i, j_exclude):
+    import statistics
+    import tracemalloc
+    times = []
+    for r in range(repeat):
+        random.seed(BENCHMARK_SEED)
+        startTime = timeit.default_timer()
+        function({})
+        times.append(timeit.default_timer() - startTime)
+    times.sort()
+
+    random.seed(BENCHMARK_SEED)
+    stats = {}
+    tracemalloc.start()
+    function(stats)
+    peakMemory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "min": times[0],
+        "median": statistics.median(times),
+        "p95": times[math.ceil(0.95 * len(times)) - 1],
+        "nodes": stats.get("nodes"),
+        "peakMemory": peakMemory,
+    }
+
+def benchmark(repeat = 5, cases = None):
     """
-    Generate a unique list of all allowed values for all positions on the the row i
-    Ignore position j_exclude
+    Run the built-in benchmark: backtrack (to a second solution) and inferred over the fixed
+    corpus of easy, hard and pathological 4 x 4, 9 x 9 and 16 x 16 boards and an empty 25 x 25
+    board (a regression check of the default branching on big boards), and generate for each
+    size up to 16 x 16, all with fixed seeds
 
     Args:
-        board (int array): sudoku board
-        i (int): row to check
-        j_exclude (int): row position to exclude
+        repeat (int, optional): timed runs per case. Defaults to 5.
+        cases (str, optional): only run cases whose name contains this text. Defaults to None.
 
     Returns:
-        int array: List of allowed values for each cell on row i (excluding j_exclude)
+        dict: JSON-ready report of the environment and the results of each case
     """
-    rowOptionsList = []
-    cellOptions = []
-    for j in range(len(board[i])):
-        if (board[i][j] == 0):
-            if (j != j_exclude):
-                cellOptions += options(board, i, j)
-    for x in cellOptions:
-        if x not in rowOptionsList:
-            rowOptionsList.append(x)
-    return rowOptionsList
-
-def optionsInCol(board, i_exclude, j):
+    import platform
+    benchmarks = []
+    for name, line in BENCHMARK_BOARDS.items():
+        board = lineToBoard(line)
+        benchmarks.append(("backtrack/" + name,
+                           lambda stats, board = board: backtrack(board, 2, stats = stats)))
+        benchmarks.append(("inferred/" + name, lambda stats, board = board: inferred(board)))
+    for k in (2, 3, 4):
+        name = "generate/{0}x{0}".format(k**2)
+        benchmarks.append((name, lambda stats, k = k: generate(k, stats = stats)))
+
+    results = {}
+    for name, function in benchmarks:
+        if cases is None or cases in name:
+            results[name] = benchmarkCase(function, repeat)
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "seed": BENCHMARK_SEED,
+        "results": results,
+    }
+
+def parseArguments(argv = None):
     """
-    Generate a unique list of all allowed values for all positions on the the col j
-    Ignore position i_exclude
+    Parse the command line.  With no command the interactive game is played.
 
     Args:
-        board (int array): sudoku board
-        i_exclude (int): col position to exclude
-        j (int): col to check
+        argv (str array, optional): arguments to parse. Defaults to sys.argv[1:].
 
     Returns:
-        int array: List of allowed values for each cell on col j (excluding i_exclude)
+        argparse.Namespace: parsed arguments; command is None for the interactive game
     """
-    colOptionsList = []
-    cellOptions = []
-    for i in range(len(board)):
-        if (board[i][j] == 0):
-            if (i != i_exclude):
-                cellOptions += options(board, i, j)
-    for x in cellOptions:
-        if x not in colOptionsList:
-            colOptionsList.append(x)
-    return colOptionsList
-
-def optionsInSubgrid(board, i, j):
+    import argparse
+    parser = argparse.ArgumentParser(description = "Sudoku command line game and batch tools.")
+    parser.add_argument("--profile", action = "store_true",
+                        help = "print solver counters on exit (or set SUDOKU_PROFILE=1)")
+    parser.add_argument("--profile-dump", default = None, metavar = "FILE",
+                        help = "also write a cProfile pstats dump to FILE (or set SUDOKU_PROFILE=FILE)")
+    parser.add_argument("--bank", default = BANK_PATH, metavar = "FILE",
+                        help = "puzzle bank serving new games (default {})".format(BANK_PATH))
+    parser.add_argument("--no-bank", action = "store_true",
+                        help = "always generate new games instead of using the puzzle bank")
+    parser.add_argument("--prefetch", action = "store_true",
+                        help = "generate the next board in the background while playing")
+    parser.add_argument("--redraw", action = "store_true",
+                        help = "only redraw the cells that change (terminals with ANSI cursor movement)")
+    commands = parser.add_subparsers(dest = "command")
+
+    generateParser = commands.add_parser("generate", help = "generate a batch of unique boards")
+    generateParser.add_argument("--size", type = int, default = 3,
+                                help = "sub grid size k, giving k**2 by k**2 boards (default 3)")
+    generateParser.add_argument("--count", type = int, default = 1,
+                                help = "number of boards wanted in the output (default 1)")
+    generateParser.add_argument("--workers", type = int, default = 0,
+                                help = "worker processes, 0 for the number of CPUs (default 0)")
+    generateParser.add_argument("--seed", default = None,
+                                help = "batch seed; the same seed gives the same boards")
+    generateParser.add_argument("--output", default = "-",
+                                help = "file to write boards to, resuming if it exists; a binary archive if it "
+                                       "ends in .sdka (default stdout)")
+    generateParser.add_argument("--symmetry", default = "none", choices = sorted(SYMMETRIES),
+                                help = "pattern of the removed positions (default none)")
+    generateParser.add_argument("--difficulty", default = "any", choices = ("any",) + DIFFICULTIES,
+                                help = "difficulty graded by the solving techniques needed (default any)")
+
+    solveParser = commands.add_parser("solve", help = "solve a file of boards, one per line")
+    solveParser.add_argument("input", nargs = "?", default = "-",
+                             help = "file of boards ('.' or '0' for empty cells) or a .sdka archive (default stdin)")
+    solveParser.add_argument("--output", default = "-",
+                             help = "file to write solutions and times to, or a .sdka archive of boards with "
+                                  "their solutions (default stdout)")
+    solveParser.add_argument("--workers", type = int, default = 1,
+                             help = "worker processes, 0 for the number of CPUs (default 1)")
+    solveParser.add_argument("--engine", default = "backtrack", choices = sorted(SOLVER_ENGINES),
+                             help = "solver engine (default backtrack)")
+    solveParser.add_argument("--cache", action = "store_true",
+                             help = "reuse the solution of an equivalent board (relabelled digits, permuted or "
+                                  "transposed rows and cols) solved earlier in the batch; not with --engine numpy")
+
+    convertParser = commands.add_parser("convert", help = "convert boards between text lines and a binary archive")
+    convertParser.add_argument("input", help = "file to read, '-' for stdin (text only)")
+    convertParser.add_argument("output", help = "file to write, '-' for stdout (text only); exactly one of "
+                                                "input and output ends in .sdka")
+
+    bankParser = commands.add_parser("bank", help = "fill the puzzle bank (see --bank)")
+    bankParser.add_argument("--size", type = int, default = 3,
+                            help = "sub grid size k, giving k**2 by k**2 boards (default 3)")
+    bankParser.add_argument("--count", type = int, default = 10,
+                            help = "number of boards wanted in the bank (default 10)")
+    bankParser.add_argument("--difficulty", default = "any", choices = ("any",) + DIFFICULTIES,
+                            help = "difficulty of the boards added (default any)")
+
+    serveParser = commands.add_parser("serve", help = "answer JSON lines requests on a local socket")
+    serveParser.add_argument("--host", default = "127.0.0.1", help = "address to listen on (default 127.0.0.1)")
+    serveParser.add_argument("--port", type = int, default = 8765, help = "TCP port to listen on (default 8765)")
+    serveParser.add_argument("--socket", default = None, metavar = "PATH",
+                             help = "listen on a Unix socket at PATH instead of TCP")
+    serveParser.add_argument("--workers", type = int, default = 0,
+                             help = "worker processes, 0 for the number of CPUs (default 0)")
+    serveParser.add_argument("--timeout", type = float, default = 10.0,
+                             help = "deadline in seconds of requests that do not give one (default 10)")
+    serveParser.add_argument("--batch-size", type = int, default = 64,
+                             help = "most solve requests sent to a worker at once (default 64)")
+    serveParser.add_argument("--batch-window", type = float, default = 2.0,
+                             help = "milliseconds to wait for more solve requests to batch (default 2)")
+
+    benchmarkParser = commands.add_parser("benchmark", help = "run the built-in benchmark, reporting JSON")
+    benchmarkParser.add_argument("--repeat", type = int, default = 5,
+                                 help = "timed runs per case (default 5)")
+    benchmarkParser.add_argument("--cases", default = None,
+                                 help = "only run cases whose name contains this text")
+    benchmarkParser.add_argument("--output", default = "-",
+                                 help = "file to write the JSON report to (default stdout)")
+    args = parser.parse_args(argv)
+
+    # Sizes As getBoardSize() Allows, --cache Only With Searching Engines, And --workers 0 For All CPUs
+    if args.command in ("generate", "bank") and not (args.size >= 2 and args.size**2 <= MAX_WIDTH):
+        parser.error("--size must be 2 to {} ({} x {} boards at most), not {}".format(
+            math.isqrt(MAX_WIDTH), MAX_WIDTH, MAX_WIDTH, args.size))
+    if args.command == "solve" and args.cache and args.engine == "numpy":
+        parser.error("--cache cannot be used with --engine numpy")
+    if getattr(args, "workers", 0) < 0:
+        parser.error("--workers must be at least 0, not {}".format(args.workers))
+    return args
+
+def main(argv = None):
+    args = parseArguments(argv)
+
+    # SUDOKU_PROFILE=1 Prints Counters, Any Other Value Is Also A pstats Dump File
+    dumpPath = args.profile_dump
+    environmentProfile = os.environ.get("SUDOKU_PROFILE", "0")
+    if environmentProfile not in ("", "0", "1") and dumpPath is None:
+        dumpPath = environmentProfile
+    if not args.profile and dumpPath is None and environmentProfile in ("", "0"):
+        return runCommand(args)
+
+    # Counters Only Cover This Process, So Profile Batch Commands With --workers 1
+    profiler = Profiler(dumpPath)
+    try:
+        with profiler:
+            return runCommand(args)
+    finally:
+        print(profiler.summary(), file = sys.stderr)
+        if dumpPath is not None:
+            import pstats
+            pstats.Stats(dumpPath, stream = sys.stderr).sort_stats("cumulative").print_stats(10)
+
+def runCommand(args):
     """
-    Generate a unique list of all allowed values for all positions with the sub grid found at
-    location i, j.  Ignores the cell i, j
+    Run the command chosen on the command line
 
     Args:
-        board (int array): sudoku board
-        i (int): row location to find sub array
-        j (int): col location to find sub array
+        args (argparse.Namespace): parsed arguments from parseArguments()
 
     Returns:
-        int array: List of allowed values for each cell with the sub grid at i, j (excluding i, j itself)
+        int: exit status
     """
 
-    subOptionsList = []
-    subOptions = []
-    activeRef = [i,j]
-
-    length = int(len(board[0]))
-    k = int(length**.5) # Sub grid width (# cells)
-    row1 = int(i // k) # Set base row sub grid number (there are k * k sub grids)
-    col1 = int(j // k)
-
-    for row2 in range(k):
-        rowRef = int(((row1 * k) + row2))
-        for col2 in range(k):
-            colRef = int(((col1 * k) + col2))
-
-            refChecker = [rowRef, colRef]
-
-            if int(board[rowRef][colRef]) == 0:
-                if refChecker != activeRef:
-                        subOptions += options(board, rowRef, colRef)
-
-    # Create List of Options Where Each Option Listed Once
-    for x in subOptions:
-        if x not in subOptionsList:
-            subOptionsList.append(x)
-    return subOptionsList
-
-def printOptions():
-    """
-    Print valid user input list for playing the game
-    """
-    print("\n~ Sudoku Command Line Game ~")
-    print("Inputs:")
-    print("'rol col value' - place a value on the board.  Eg '3 2 6' will place 6 at row 3, col 2.")
-    print(" - Note that indexing is zero based")
-    print("'undo' or 'u' - undo your last move.")
-    print("'hint' or 'h' - an asterisk will be displayed at the easiest location for your next play.")
-    print("'solve' or 's' - the board will solved and displayed.")
-    print("'new' or 'n' - generate a new board.")
-    print("'help' or 'h' - display valid input options.")
-    print("'restart' or 'r' - restart the board from the beginning.")
-    print("'quit' or 'q' - quit the game.")
+    if args.command in ("generate", "bank") and args.difficulty not in ("any",) + reachableDifficulties(args.size):
+        print("No {} x {} boards are {}; choose from: any, {}.".format(args.size**2, args.size**2, args.difficulty,
+                                                                      ", ".join(reachableDifficulties(args.size))),
+              file = sys.stderr)
+        return 2
+
+    if args.command == "generate":
+        try:
+            generated = generateBatch(args.size, args.count, args.output, args.workers or None, args.seed,
+                                      args.symmetry, args.difficulty)
+        except KeyboardInterrupt:
+            print("Stopped.  Run the same command again to resume.", file = sys.stderr)
+            return 130
+        except RuntimeError as error:
+            # No Board Of The Difficulty In DIFFICULTY_ATTEMPTS Tries
+            print("{}.  Run the same command again to retry.".format(error), file = sys.stderr)
+            return 1
+        print("Generated {} boards.".format(generated), file = sys.stderr)
+        return 0
+
+    if args.command == "solve":
+        from sudoku_archive import ARCHIVE_SUFFIX, Archive, ArchiveWriter
+        # Archives Are Read And Written By Suffix, Anything Else As Lines Of Text
+        archive = None
+        if args.input.endswith(ARCHIVE_SUFFIX):
+            inFile = Archive(args.input)
+            lines = inFile.lines()
+        else:
+            inFile = lines = sys.stdin if args.input == "-" else open(args.input)
+        if args.output.endswith(ARCHIVE_SUFFIX):
+            outFile = archive = ArchiveWriter(args.output, solutions = True)
+        else:
+            outFile = sys.stdout if args.output == "-" else open(args.output, "w")
+        stats = {}
+        startTime = timeit.default_timer()
+        try:
+            total, solved = solveBatch(lines, outFile, args.workers or None, args.engine, archive = archive,
+                                       cache = args.cache, stats = stats)
+        finally:
+            for f in (inFile, outFile):
+                if f not in (sys.stdin, sys.stdout):
+                    f.close()
+        totalTime = timeit.default_timer() - startTime
+        print("Solved {} of {} boards in {:.3f} secs.".format(solved, total, totalTime), file = sys.stderr)
+        if args.cache:
+            hitRate = stats["cacheHits"] / stats["cacheLookups"] if stats["cacheLookups"] else 0.0
+            print("Cache hit rate: {:.1%} ({} of {} boards).".format(
+                hitRate, stats["cacheHits"], stats["cacheLookups"]), file = sys.stderr)
+        return 0
+
+    if args.command == "convert":
+        from sudoku_archive import ARCHIVE_SUFFIX, archiveToText, textToArchive
+        if args.input.endswith(ARCHIVE_SUFFIX) == args.output.endswith(ARCHIVE_SUFFIX):
+            print("Convert needs exactly one of the input and output to end in {}.".format(ARCHIVE_SUFFIX),
+                  file = sys.stderr)
+            return 2
+        if args.output.endswith(ARCHIVE_SUFFIX):
+            inFile = sys.stdin if args.input == "-" else open(args.input)
+            try:
+                converted = textToArchive(inFile, args.output)
+            finally:
+                if inFile is not sys.stdin:
+                    inFile.close()
+        elif args.output == "-":
+            converted = archiveToText(args.input, sys.stdout)
+        else:
+            with open(args.output, "w") as outFile:
+                converted = archiveToText(args.input, outFile)
+        print("Converted {} boards.".format(converted), file = sys.stderr)
+        return 0
+
+    if args.command == "benchmark":
+        import json
+        report = json.dumps(benchmark(args.repeat, args.cases), indent = 2)
+        if args.output == "-":
+            print(report)
+        else:
+            with open(args.output, "w") as outFile:
+                outFile.write(report + "\n")
+        return 0
+
+    if args.command == "serve":
+        from sudoku_server import serve
+        serve(args.host, args.port, args.socket, args.workers or None, args.timeout, args.batch_size,
+              args.batch_window / 1000)
+        return 0
+
+    if args.command == "bank":
+        try:
+            added = fillBank(args.bank, args.size, args.count, args.difficulty)
+        except RuntimeError as error:
+            print("{}.  Run the same command again to retry.".format(error), file = sys.stderr)
+            return 1
+        print("Added {} boards to {}.".format(added, args.bank), file = sys.stderr)
+        return 0
 
-def main():
     print("~ Sudoku Command Line Game ~")
-    boardSize = getBoardSize()
-    board = generate(boardSize)
-    play(board)
+    bank = None
+    if not args.no_bank:
+        import sqlite3
+        try:
+            bank = PuzzleBank(args.bank)
+        except sqlite3.Error as error:
+            print("Puzzle bank unavailable ({}), generating boards instead.".format(error), file = sys.stderr)
+    # Start On The Usual 9 x 9 Board While The Size Is Chosen
+    prefetcher = None
+    if args.prefetch:
+        prefetcher = BoardPrefetcher()
+        prefetcher.start(3)
+    try:
+        boardSize = getBoardSize()
+        board = newBoard(boardSize, bank, prefetcher)
+        return play(board, bank, prefetcher, BoardRenderer(args.redraw))
+    finally:
+        if prefetcher is not None:
+            prefetcher.cancel()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
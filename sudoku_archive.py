@@ -0,0 +1,371 @@
+"""
+Compact binary sudoku archives, loaded by the batch commands for files ending in ARCHIVE_SUFFIX.
+
+An archive is a 16 byte header followed by fixed size records, so puzzle i is found by offset
+without reading the puzzles before it.  The header holds, little endian:
+
+    magic     4 bytes   b"SDKA"
+    version   1 byte    1
+    k         1 byte    sub grid size (boards are k**2 by k**2)
+    flags     1 byte    ARCHIVE_SOLUTIONS | ARCHIVE_DIFFICULTY
+    bits      1 byte    bits per cell
+    count     8 bytes   number of records
+
+Each record is the puzzle, then the solution if ARCHIVE_SOLUTIONS is set, then one difficulty
+byte if ARCHIVE_DIFFICULTY is set (0 for unknown, else 1 + its index in DIFFICULTIES).  A board
+is packed row by row at a fixed number of bits per cell, just enough for its largest value
+(4 bits for 9 x 9, 5 bits for 16 x 16 and 25 x 25), cell c taking bits c * bits up of a little
+endian integer.  An unsolvable puzzle is stored with an empty solution.
+
+Author: Thomas O'Mara
+Date: 2024
+License: MIT License
+"""
+
+import math
+import mmap
+import os
+import struct
+
+from sudoku_engine import DIFFICULTIES, Board, boardCells, boardToLine, lineToBoard
+
+class Archive:
+    """
+    Memory mapped reader of a puzzle archive
+
+    Only the header is read on opening; archive[i] unpacks record i straight from the mapped
+    file, so archives far bigger than memory can be iterated or sampled at random.
+
+        with Archive("puzzles.sdka") as archive:
+            board = archive[12345]
+
+    Args:
+        path (str): archive file
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError("'{}' is not a sudoku archive".format(path))
+        try:
+            header = readHeader(self.data, path)
+        except ValueError:
+            self.close()
+            raise
+        self.k, self.flags, self.bits, self.count = header
+        self.n = self.k * self.k
+        self.boardSize = boardBytes(self.n, self.bits)
+        self.recordSize = recordBytes(self.n, self.bits, self.flags)
+        if len(self.data) < ARCHIVE_HEADER.size + self.count * self.recordSize:
+            self.close()
+            raise ValueError("Archive '{}' is truncated".format(path))
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        """
+        Puzzle i as a Board
+        """
+        return unpackBoard(self.data, self.offset(i), self.n, self.bits)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def offset(self, i):
+        """
+        Byte offset of record i (negative i counting from the end)
+        """
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("Archive record {} out of range".format(i))
+        return ARCHIVE_HEADER.size + i * self.recordSize
+
+    def solution(self, i):
+        """
+        Solution of puzzle i as a Board (empty if it has none); None if the archive has no solutions
+        """
+        if not self.flags & ARCHIVE_SOLUTIONS:
+            return None
+        return unpackBoard(self.data, self.offset(i) + self.boardSize, self.n, self.bits)
+
+    def difficulty(self, i):
+        """
+        Difficulty of puzzle i, one of DIFFICULTIES; None if unknown
+        """
+        if not self.flags & ARCHIVE_DIFFICULTY:
+            return None
+        level = self.data[self.offset(i) + self.recordSize - 1]
+        return DIFFICULTIES[level - 1] if level else None
+
+    def records(self):
+        """
+        Generate (puzzle, solution, difficulty) for every record, as solution() and difficulty()
+        """
+        for i in range(self.count):
+            yield self[i], self.solution(i), self.difficulty(i)
+
+    def lines(self):
+        """
+        Generate every puzzle encoded by boardToLine(), for the text batch tools
+        """
+        for board in self:
+            yield boardToLine(board)
+
+    def close(self):
+        """
+        Unmap and close the file
+        """
+        self.data.close()
+        self.file.close()
+
+class ArchiveWriter:
+    """
+    Streaming writer of a puzzle archive
+
+    Records are appended as they are added and the header count is rewritten on flush() and
+    close(), so an archive is readable after every flush.  An existing archive is replaced, unless
+    resume is set: then it is appended to, dropping a partly written last record, so a stopped
+    batch can resume where it left off.
+
+    Args:
+        path (str): archive file, created if missing
+        solutions (bool, optional): store a solution with every puzzle. Defaults to False.
+        difficulty (bool, optional): store a difficulty with every puzzle. Defaults to False.
+        k (int, optional): sub grid size.  Defaults to the size of the first board added.
+        resume (bool, optional): append to an existing archive, which must have the same size
+                                 and record fields. Defaults to False.
+    """
+
+    def __init__(self, path, solutions = False, difficulty = False, k = None, resume = False):
+        self.flags = (ARCHIVE_SOLUTIONS if solutions else 0) | (ARCHIVE_DIFFICULTY if difficulty else 0)
+        self.k = k
+        self.count = 0
+        self.file = None
+        if resume and os.path.exists(path) and os.path.getsize(path) > 0:
+            self.file = open(path, "rb+")
+            k, flags, bits, count = readHeader(self.file.read(ARCHIVE_HEADER.size), path)
+            if flags != self.flags or (k and self.k is not None and k != self.k):
+                self.file.close()
+                raise ValueError("Archive '{}' has a different board size or record fields".format(path))
+            if k:
+                self.setSize(k)
+                self.count = (os.path.getsize(path) - ARCHIVE_HEADER.size) // self.recordSize
+            elif self.k is not None:
+                self.setSize(self.k)
+            self.file.truncate(ARCHIVE_HEADER.size + (self.count * self.recordSize if self.count else 0))
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.file = open(path, "wb")
+            if k is not None:
+                self.setSize(k)
+            self.writeHeader()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def setSize(self, k):
+        """
+        Fix the board size of the archive
+        """
+        self.k = k
+        self.n = k * k
+        self.bits = cellBits(self.n)
+        self.recordSize = recordBytes(self.n, self.bits, self.flags)
+
+    def add(self, puzzle, solution = None, difficulty = None):
+        """
+        Append a record
+
+        Args:
+            puzzle (Board or int array): the puzzle
+            solution (Board or int array, optional): its solution, stored if the archive has
+                                                     solutions.  Defaults to None (empty).
+            difficulty (str, optional): one of DIFFICULTIES, stored if the archive has
+                                        difficulties.  Defaults to None (unknown).
+        """
+        n, cells = boardCells(puzzle)
+        if self.k is None:
+            self.setSize(math.isqrt(n))
+            self.writeHeader()
+            self.file.seek(0, os.SEEK_END)
+        if n != self.n:
+            raise ValueError("A {} x {} archive cannot hold a {} x {} board".format(self.n, self.n, n, n))
+        record = packCells(cells, self.bits)
+        if self.flags & ARCHIVE_SOLUTIONS:
+            record += packCells(bytes(n * n) if solution is None else boardCells(solution)[1], self.bits)
+        if self.flags & ARCHIVE_DIFFICULTY:
+            level = 0 if difficulty in (None, "any") else DIFFICULTIES.index(difficulty) + 1
+            record += bytes((level,))
+        self.file.write(record)
+        self.count += 1
+
+    def writeHeader(self):
+        """
+        Write the header for the records added so far
+        """
+        self.file.seek(0)
+        self.file.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, self.k or 0, self.flags,
+                                            cellBits(self.k * self.k) if self.k else 0, self.count))
+
+    def flush(self):
+        """
+        Update the header count and write everything added so far to the file
+        """
+        self.writeHeader()
+        self.file.seek(0, os.SEEK_END)
+        self.file.flush()
+
+    def close(self):
+        """
+        Flush and close the file
+        """
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+def readHeader(data, path):
+    """
+    Check and decode an archive header
+
+    Returns:
+        tuple: (k, flags, bits, count)
+    """
+    if len(data) < ARCHIVE_HEADER.size:
+        raise ValueError("'{}' is not a sudoku archive".format(path))
+    magic, version, k, flags, bits, count = ARCHIVE_HEADER.unpack_from(data)
+    if magic != ARCHIVE_MAGIC:
+        raise ValueError("'{}' is not a sudoku archive".format(path))
+    if version != ARCHIVE_VERSION:
+        raise ValueError("Archive '{}' has unsupported version {}".format(path, version))
+    if k == 0 and count == 0:
+        return k, flags, bits, count
+    if k < 2 or bits != cellBits(k * k):
+        raise ValueError("Archive '{}' has a corrupt header".format(path))
+    return k, flags, bits, count
+
+def cellBits(n):
+    """
+    Bits per cell needed for the values 0 to n
+    """
+    return n.bit_length()
+
+def boardBytes(n, bits):
+    """
+    Bytes taken by an n by n board packed at bits per cell
+    """
+    return (n * n * bits + 7) // 8
+
+def recordBytes(n, bits, flags):
+    """
+    Bytes taken by one record of an archive of n by n boards
+    """
+    size = boardBytes(n, bits)
+    if flags & ARCHIVE_SOLUTIONS:
+        size += boardBytes(n, bits)
+    if flags & ARCHIVE_DIFFICULTY:
+        size += 1
+    return size
+
+def packCells(cells, bits):
+    """
+    Pack cell values at bits per cell, cell c taking bits c * bits up of a little endian integer
+
+    Returns:
+        bytes: the packed cells
+    """
+    value = 0
+    for x in reversed(cells):
+        value = (value << bits) | x
+    return value.to_bytes((len(cells) * bits + 7) // 8, "little")
+
+def unpackBoard(data, offset, n, bits):
+    """
+    Board packed by packCells() at offset in data
+    """
+    value = int.from_bytes(data[offset:offset + boardBytes(n, bits)], "little")
+    mask = (1 << bits) - 1
+    cells = bytearray(n * n)
+    for c in range(n * n):
+        cells[c] = value & mask
+        value >>= bits
+    return Board(n, cells)
+
+def textToArchive(lines, path):
+    """
+    Convert lines of text to an archive.  Each line holds a board encoded by boardToLine(),
+    optionally followed (after a comma or whitespace) by its solution and a difficulty, as
+    archiveToText() writes.  Blank and '#' comment lines are skipped.
+
+    Args:
+        lines (iterable): lines of text, read lazily
+        path (str): archive file to write, replacing any existing file; solutions and
+                    difficulties are stored if the first board has them
+
+    Returns:
+        int: the number of boards written
+    """
+    writer = None
+    try:
+        for line in lines:
+            fields = line.replace(",", " ").split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            # Parse First, So A Bad First Line Leaves No Archive Behind
+            puzzle = lineToBoard(fields[0])
+            solution = lineToBoard(fields[1]) if len(fields) > 1 else None
+            difficulty = fields[2] if len(fields) > 2 and fields[2] in DIFFICULTIES else None
+            if writer is None:
+                writer = ArchiveWriter(path, len(fields) > 1, len(fields) > 2)
+            writer.add(puzzle, solution, difficulty)
+    finally:
+        if writer is not None:
+            writer.close()
+    return writer.count if writer is not None else 0
+
+def archiveToText(path, outFile):
+    """
+    Write every record of an archive to outFile as a line: the puzzle encoded by boardToLine(),
+    then its solution and difficulty if the archive has them, separated by commas
+
+    Returns:
+        int: the number of boards written
+    """
+    with Archive(path) as archive:
+        for puzzle, solution, difficulty in archive.records():
+            fields = [boardToLine(puzzle)]
+            if solution is not None:
+                fields.append(boardToLine(solution))
+            if archive.flags & ARCHIVE_DIFFICULTY:
+                fields.append(difficulty or "any")
+            outFile.write(",".join(fields) + "\n")
+        return len(archive)
+
+# Archive Header: Magic, Version, k, Flags, Bits Per Cell, Record Count
+ARCHIVE_HEADER = struct.Struct("<4sBBBBQ")
+ARCHIVE_MAGIC = b"SDKA"
+ARCHIVE_VERSION = 1
+
+# Header Flags For The Optional Record Fields
+ARCHIVE_SOLUTIONS = 1
+ARCHIVE_DIFFICULTY = 2
+
+# File Name Ending The Batch Commands Read And Write As An Archive
+ARCHIVE_SUFFIX = ".sdka"
@@ -0,0 +1,2174 @@
+"""
+Sudoku engine: boards, solvers, generation and grading.
+
+Importing it prints nothing and loads only the standard library; the DLX and NumPy solvers are
+loaded the first time they are used.  Progress and timing are reported through optional
+callbacks, eg generate(k, log = print).
+
+Author: Thomas O'Mara
+Date: 2024
+License: MIT License
+"""
+
+import collections
+import itertools
+import math
+import random
+import timeit
+
+# Public Names, Re-exported By sudoku.py's __getattr__ (PROFILER Changes While Profiling, So Read It From Here)
+__all__ = [
+    "generate", "DIFFICULTY_ATTEMPTS", "reachableDifficulties", "solvableWithout", "PORTFOLIO_TIMEOUT",
+    "NODE_BUDGETS", "removalGroups", "SYMMETRIES", "hasOtherSolution", "createEmptyBoard", "generateRandom",
+    "randomPosition", "hint", "options", "maskValues", "Board", "BoardRow", "boardCells", "copyLike",
+    "Candidates", "subgridValues", "colRowValues", "checkBoardCompleted", "solve", "backtrack",
+    "iterSolutions", "countSolutions", "cluesConsistent", "searchSolutions", "SearchBudgetExceeded",
+    "minimumRemainingValues", "tieBreakFirst", "tieBreakRandom", "tieBreakDegree", "TIE_BREAKS", "BRANCHING",
+    "MRV_WIDTH", "quickHint", "inferred", "propagate", "boardTables", "BOARD_TABLES", "valueBySingle",
+    "optionsInRow", "optionsInCol", "optionsInSubgrid", "grade", "TECHNIQUES", "TECHNIQUE_DIFFICULTY",
+    "DIFFICULTIES", "LogicGrid", "dlx", "numpySolve", "portfolioSolve", "SOLVER_ENGINES", "hasUniqueSolution",
+    "canonicalForm", "lineOrderings", "canonicalResult", "toCanonical", "fromCanonical", "SolutionCache",
+    "Profiler", "boardToLine", "lineToBoard", "symbolValue", "SYMBOLS", "MAX_WIDTH",
+]
+
+def generate(k, engine = "backtrack", verbose = False, symmetry = "none", nodeBudget = "auto", stats = None,
+             difficulty = "any", log = None, deadline = None):
+    """
+    Generate a new random board
+
+    A random completed board is made, then every position is visited once in random order and its
+    value removed if the board is still uniquely solvable without it.  As the completed board is
+    known, a removal only needs a search for a solution with a different value at the removed
+    position, which stops at the first one found.  The search reuses the candidate tracking of
+    the board being reduced rather than starting from scratch.  A removal whose check runs over
+    nodeBudget search nodes is treated as not unique, so sparse 16 x 16 (and bigger) boards keep
+    the few clues that are expensive to prove redundant rather than stalling generation.  On
+    25 x 25 boards and bigger nearly every check that propagation alone cannot settle runs over
+    any practical budget, so the "auto" budget there is a handful of nodes.
+
+    For an "easy", "medium" or "hard" difficulty a removal is only kept if the board can still
+    be solved without guessing by the techniques of that difficulty or easier (see grade()),
+    which also proves the solution unique without a search.  Boards are generated until one
+    grades at exactly the difficulty asked for.
+
+    Args:
+        k (int): size of board k**2 by k**2.  If k = 2, the board is 4 x 4
+        engine (str, optional): solver engine used for the uniqueness checks, "backtrack", "dlx"
+                                or "portfolio" (see hasOtherSolution()).  Defaults to "backtrack".
+        verbose (bool, optional): print a message before generating (log = print). Defaults to
+                                  False.
+        symmetry (str, optional): pattern of the removed positions, one of SYMMETRIES.  Defaults
+                                  to "none".
+        nodeBudget (int, optional): search nodes allowed per backtrack uniqueness check, None
+                                    for no limit, or "auto" for the budget in NODE_BUDGETS
+                                    for size k.  Defaults to "auto".
+        stats (dict, optional): stats["nodes"] counts the backtrack search nodes explored.
+                                Defaults to None.
+        difficulty (str, optional): one of DIFFICULTIES, or "any". Defaults to "any".
+        log (function, optional): called with a message before generating. Defaults to None.
+        deadline (float, optional): raise SearchBudgetExceeded once timeit.default_timer() passes
+                                    this, checked while completing a board and between removals.
+                                    Defaults to None (no limit).
+
+    Returns:
+        int array: A random, uniquely solvable k**2 by k**2 board
+    """
+    if difficulty != "any" and difficulty not in DIFFICULTIES:
+        raise ValueError("Unknown difficulty '{}'".format(difficulty))
+    if difficulty != "any" and difficulty not in reachableDifficulties(k):
+        raise ValueError("No {} x {} boards are {}".format(k * k, k * k, difficulty))
+
+    if verbose and log is None:
+        log = print
+    if log is not None and k == 2:
+        log("Generating board... (this may take a while)")
+    elif log is not None and k > 2:
+        log("Generating board... (this may take a very long time)")
+
+    n = k**2
+    if nodeBudget == "auto":
+        nodeBudget = NODE_BUDGETS.get(k, NODE_BUDGETS[None])
+    hardest = None
+    if difficulty in TECHNIQUE_DIFFICULTY.values():
+        hardest = DIFFICULTIES.index(difficulty)
+
+    for attempt in range(DIFFICULTY_ATTEMPTS):
+        # Generate a New Completed Board
+        solution = generateRandom(createEmptyBoard(k), stats, deadline)[0]
+        if PROFILER is not None:
+            PROFILER.count("copies")
+        cands = Candidates(solution)
+
+        # Remove Each Group Of Positions Once, Keeping The Removal If The Solution Stays Unique
+        for group in removalGroups(n, symmetry):
+            if deadline is not None and timeit.default_timer() > deadline:
+                raise SearchBudgetExceeded()
+            for i, j in group:
+                cands.unplace(i, j)
+            if hardest is None:
+                restore = hasOtherSolution(cands, solution, group, engine, nodeBudget, stats)
+            else:
+                restore = not solvableWithout(cands.board, hardest)
+            if restore:
+                for i, j in group:
+                    cands.place(i, j, solution[i][j])
+
+        if difficulty == "any" or grade(cands.board)["difficulty"] == difficulty:
+            return cands.board.toGrid()
+    raise RuntimeError("No {} {} x {} board found in {} attempts".format(difficulty, n, n, DIFFICULTY_ATTEMPTS))
+
+# Boards generate() Tries Before Giving Up On A Difficulty
+DIFFICULTY_ATTEMPTS = 100
+
+def reachableDifficulties(k):
+    """
+    Difficulties generate() can make boards of for size k; every 4 x 4 board is solved by
+    singles alone, so is easy
+
+    Args:
+        k (int): size of board k**2 by k**2
+
+    Returns:
+        tuple: the reachable DIFFICULTIES
+    """
+    return DIFFICULTIES[:1] if k == 2 else DIFFICULTIES
+
+def solvableWithout(board, hardest):
+    """
+    Check if a board can be solved without guessing by the techniques of a difficulty or easier
+
+    Args:
+        board (Board or int array): sudoku board
+        hardest (int): index into DIFFICULTIES of the hardest difficulty allowed
+
+    Returns:
+        bool: True if solvable
+    """
+    steps = dict.fromkeys(TECHNIQUES, 0)
+    if not LogicGrid(board).deduce(steps):
+        return False
+    return all(DIFFICULTIES.index(TECHNIQUE_DIFFICULTY[name]) <= hardest for name in TECHNIQUES if steps[name])
+
+# Seconds A Portfolio Uniqueness Check In generate() May Take Before Assuming Another Solution
+PORTFOLIO_TIMEOUT = 2.0
+
+# Default Uniqueness Check Budget For generate() By Size k (None For Any Other Size)
+NODE_BUDGETS = {
+    2: 100,
+    3: 100,
+    4: 100,
+    None: 5,
+}
+
+def removalGroups(n, symmetry = "none"):
+    """
+    Split the positions of an n by n board into groups removed together by generate(), in
+    random order
+
+    Args:
+        n (int): board width
+        symmetry (str, optional): one of SYMMETRIES. Defaults to "none".
+
+    Returns:
+        list: groups of row, col positions, each position in exactly one group
+    """
+    if symmetry not in SYMMETRIES:
+        raise ValueError("Unknown symmetry '{}'".format(symmetry))
+    groups = []
+    grouped = set()
+    for i in range(n):
+        for j in range(n):
+            if (i, j) not in grouped:
+                group = sorted({(i, j)} | set(SYMMETRIES[symmetry](n, i, j)))
+                grouped.update(group)
+                groups.append(group)
+    random.shuffle(groups)
+    return groups
+
+# Positions Mirroring (i, j) For Each Removal Symmetry
+SYMMETRIES = {
+    "none": lambda n, i, j: [],
+    "rotational": lambda n, i, j: [(n - 1 - i, n - 1 - j)],
+    "mirror": lambda n, i, j: [(i, n - 1 - j)],
+    "diagonal": lambda n, i, j: [(j, i)],
+}
+
+def hasOtherSolution(cands, solution, cells, engine = "backtrack", nodeBudget = None, stats = None):
+    """
+    Check if a board has a solution other than a known one, given the board had only that
+    solution before the values at cells were removed
+
+    Any other solution must differ from the known one at one of the removed cells, so each other
+    option at each removed cell is tried in turn, stopping at the first solution found.
+
+    Args:
+        cands (Candidates): candidate tracking for the board; left unchanged
+        solution (int array): the known solution
+        cells (list): row, col positions removed since the board was last known to be unique
+        engine (str, optional): "backtrack" to search on cands in place, "dlx", or "portfolio"
+                                to search in place and race a portfolioSolve() over any search
+                                that runs over nodeBudget.  Defaults to "backtrack".
+        nodeBudget (int, optional): search nodes allowed per search (in place, or by dlx) before
+                                    giving up and assuming another solution exists. Defaults to
+                                    None.
+        stats (dict, optional): stats["nodes"] counts the search nodes explored. Defaults to None.
+
+    Returns:
+        bool: True if another solution exists (or may exist, if a search ran over nodeBudget)
+    """
+    board = cands.board
+    for i, j in cells:
+        for x in cands.options(i, j):
+            if x == solution[i][j]:
+                continue
+            if engine == "dlx":
+                trialBoard = board.copy()
+                trialBoard[i, j] = x
+                if PROFILER is not None:
+                    PROFILER.count("copies")
+                try:
+                    found = len(dlx(trialBoard, 1, nodeBudget, stats)) > 0
+                except SearchBudgetExceeded:
+                    found = True
+            else:
+                mark = cands.mark()
+                cands.place(i, j, x)
+                checkStats = {}
+                try:
+                    found = next(searchSolutions(cands, "mrv", stats = checkStats,
+                                                 nodeBudget = nodeBudget), None) is not None
+                except SearchBudgetExceeded:
+                    found = None
+                cands.undo(mark)
+                if stats is not None:
+                    stats["nodes"] = stats.get("nodes", 0) + checkStats["nodes"]
+
+                # Race The Checks Too Long To Search In Place, Or Assume Another Solution
+                if found is None and engine == "portfolio":
+                    trialBoard = board.copy()
+                    trialBoard[i, j] = x
+                    try:
+                        found = len(portfolioSolve(trialBoard, 1, timeout = PORTFOLIO_TIMEOUT)) > 0
+                    except SearchBudgetExceeded:
+                        found = True
+                elif found is None:
+                    found = True
+            if found:
+                return True
+    return False
+
+def createEmptyBoard(k):
+    """
+    Create a k**2 by k**2 Board
+
+    Args:
+        k (int): size of board k**2.  Ie if k = 2 the board is 4 x 4
+
+    Returns:
+        int array: empty k**2 by k**2 array
+    """
+    n = k**2
+    board = []
+    for i in range(n):
+        board.append([0] * n)
+    return board
+
+def generateRandom(board, stats = None, deadline = None):
+    """
+    Generate a ramdomised board
+
+    Args:
+        board (int array): empty sudoku board
+        stats (dict, optional): stats["nodes"] counts the search nodes explored. Defaults to None.
+        deadline (float, optional): as for searchSolutions(). Defaults to None (no limit).
+
+    Returns:
+        int array: randomised board
+    """
+    if PROFILER is not None:
+        PROFILER.count("generateRandom")
+        PROFILER.count("copies", 2)
+    cands = Candidates(Board.fromGrid(board))
+    for solved in searchSolutions(cands, "mrv", "random", shuffle = True, stats = stats, deadline = deadline):
+        return [copyLike(solved, board)]
+    return []
+
+def randomPosition(board):
+    """
+    Find an empty position on the board
+
+    Args:
+        board (int array): sudoku board
+
+    Returns:
+        int: a random row and col position representing an empty position
+    """
+    n, cells = boardCells(board)
+    emptyPositions = [c for c in range(n * n) if cells[c] == 0]
+    returnValue = emptyPositions[random.randint(0, len(emptyPositions)-1)]
+    return returnValue // n, returnValue % n
+
+def hint(board):
+    """
+    Find the row, col position that is best to play next based on finding the location
+    with the lowest number of potential values that can be played at each empty location
+
+    Args:
+        board (int array): sudoku board
+
+    Returns:
+        int: row and col location that is best to play next (least number of potential options)
+    """
+    rowRef = 0
+    colRef = 0
+    minOptions = len(board)
+    if checkBoardCompleted(board):
+        return None, None
+    else:
+        cands = Candidates(board)
+        cells = cands.cells
+        for c, (i, j, b) in enumerate(boardTables(cands.n)[0]):
+            if cells[c] == 0:
+                optionCount = cands.mask(i, j).bit_count()
+                if optionCount < minOptions:
+                    minOptions = optionCount
+                    rowRef = i
+                    colRef = j
+        return rowRef, colRef
+
+def options(board, i, j):
+    """
+    Generate a list of valid values that can be played at a specified i, j position
+
+    Args:
+        board (int array): sudoku board
+        i (int): row position
+        j (int): col position
+
+    Returns:
+        int array: list of possible valid values that can be placed at position i, j
+    """
+    if PROFILER is not None:
+        PROFILER.count("options")
+    n = len(board)
+    k = math.isqrt(n)
+    usedMask = 0
+    for x in range(n):
+        usedMask |= (1 << board[i][x]) | (1 << board[x][j])
+    row1 = (i // k) * k
+    col1 = (j // k) * k
+    for rowRef in range(row1, row1 + k):
+        for colRef in range(col1, col1 + k):
+            usedMask |= 1 << board[rowRef][colRef]
+    # Bit x Is Set For Each Used Value x (Bit 0 Collects The Empty Cells)
+    return maskValues(((1 << n) - 1) & ~(usedMask >> 1))
+
+def maskValues(mask):
+    """
+    Convert a candidate bitmask into the list of values it holds
+
+    Args:
+        mask (int): bitmask where bit (x - 1) is set if the value x is allowed
+
+    Returns:
+        int array: allowed values in ascending order
+    """
+    values = []
+    while mask:
+        lowBit = mask & -mask
+        values.append(lowBit.bit_length())
+        mask ^= lowBit
+    return values
+
+class Board:
+    """
+    Compact sudoku board holding every cell in one flat bytearray, row by row
+
+    A 9 x 9 board takes 81 bytes of cell storage instead of ten lists of object pointers, so
+    large batches of boards fit in a fraction of the memory, and the solver reads a cell with a
+    single index (cell c is at row c // n, col c % n) using the index tables from boardTables().
+
+    board[i, j] reads and writes the value at row i, col j.  board[i] is a write through view of
+    row i, so board[i][j] works too and a Board can be passed anywhere an int array board is
+    accepted; solver functions return Boards when given one.
+
+    Args:
+        n (int): board width (k**2).  Ie if n = 9 the board is 9 x 9
+        cells (bytes, optional): the n * n values row by row (0 for empty).  Defaults to an
+                                 empty board.
+    """
+
+    __slots__ = ("n", "k", "cells")
+
+    def __init__(self, n, cells = None):
+        self.n = n
+        self.k = math.isqrt(n)
+        if cells is None:
+            self.cells = bytearray(n * n)
+        else:
+            self.cells = bytearray(cells)
+            if len(self.cells) != n * n:
+                raise ValueError("A {} x {} board needs {} cells, not {}".format(n, n, n * n, len(self.cells)))
+
+    @classmethod
+    def fromGrid(cls, grid):
+        """
+        New Board holding the values of an int array board (or a copy of a Board)
+        """
+        if isinstance(grid, Board):
+            return grid.copy()
+        return cls(len(grid), [x for row in grid for x in row])
+
+    @classmethod
+    def fromLine(cls, line):
+        """
+        New Board decoded from a line written by boardToLine()
+        """
+        return cls.fromGrid(lineToBoard(line))
+
+    def toGrid(self):
+        """
+        The board as an int array (a list of row lists)
+        """
+        n = self.n
+        cells = self.cells
+        return [list(cells[i * n:(i + 1) * n]) for i in range(n)]
+
+    def copy(self):
+        """
+        Independent copy of the board
+        """
+        return Board(self.n, self.cells)
+
+    def snapshot(self):
+        """
+        Immutable copy of the cell values, to restore() later
+        """
+        return bytes(self.cells)
+
+    def restore(self, snapshot):
+        """
+        Put back the cell values saved by snapshot(), in place
+        """
+        self.cells[:] = snapshot
+
+    def tables(self):
+        """
+        The shared (positions, units, cellUnits, peers) index tables for this board size
+        """
+        return boardTables(self.n)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = key
+            return self.cells[i * self.n + j]
+        return BoardRow(self, key)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, tuple):
+            i, j = key
+            self.cells[i * self.n + j] = value
+        else:
+            BoardRow(self, key)[:] = value
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield BoardRow(self, i)
+
+    def __eq__(self, other):
+        if isinstance(other, Board):
+            return self.n == other.n and self.cells == other.cells
+        if isinstance(other, list):
+            return self.toGrid() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __repr__(self):
+        return "Board.fromLine('{}')".format(boardToLine(self))
+
+class BoardRow:
+    """
+    Write through view of one row of a Board, so board[i][j] works as it does for an int array
+    """
+
+    __slots__ = ("cells", "start", "n")
+
+    def __init__(self, board, i):
+        if i < 0:
+            i += board.n
+        if not 0 <= i < board.n:
+            raise IndexError("board row index out of range")
+        self.cells = board.cells
+        self.start = i * board.n
+        self.n = board.n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, j):
+        if isinstance(j, slice):
+            return list(self.cells[self.start:self.start + self.n][j])
+        if j < 0:
+            j += self.n
+        if not 0 <= j < self.n:
+            raise IndexError("board col index out of range")
+        return self.cells[self.start + j]
+
+    def __setitem__(self, j, value):
+        if isinstance(j, slice):
+            values = list(self.cells[self.start:self.start + self.n])
+            values[j] = value
+            if len(values) != self.n:
+                raise ValueError("A board row must keep {} cells".format(self.n))
+            self.cells[self.start:self.start + self.n] = bytes(values)
+            return
+        if j < 0:
+            j += self.n
+        if not 0 <= j < self.n:
+            raise IndexError("board col index out of range")
+        self.cells[self.start + j] = value
+
+    def __iter__(self):
+        return iter(self.cells[self.start:self.start + self.n])
+
+    def __eq__(self, other):
+        if isinstance(other, (BoardRow, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+def boardCells(board):
+    """
+    Width and flat row by row cell values of a board
+
+    Args:
+        board (Board or int array): sudoku board
+
+    Returns:
+        tuple: (n, cells) where cells[i * n + j] is the value at row i, col j
+    """
+    if isinstance(board, Board):
+        return board.n, board.cells
+    return len(board), [x for row in board for x in row]
+
+def copyLike(board, like):
+    """
+    Copy of a Board as the same type as like: a Board if like is one, an int array otherwise
+    """
+    if isinstance(like, Board):
+        return board.copy()
+    return board.toGrid()
+
+class Candidates:
+    """
+    Candidate tracking for a sudoku board
+
+    Keeps a bitmask of the values already placed in every row, col and sub grid, updated
+    incrementally as values are placed and removed, so the allowed values at a position are
+    found with a few bitwise operations instead of rescanning the board.  Value x is stored
+    as bit (x - 1).
+
+    Every place() is recorded on a trail so a search can roll the board back to an earlier
+    mark() with undo().
+
+    Args:
+        board (Board or int array): sudoku board.  A Board is changed in place by place(),
+                                    unplace() and undo(); an int array is first copied into a
+                                    new Board (cands.board).
+    """
+
+    def __init__(self, board):
+        if not isinstance(board, Board):
+            board = Board.fromGrid(board)
+        n = board.n
+        self.board = board
+        self.cells = board.cells
+        self.n = n
+        self.k = board.k
+        self.full = (1 << n) - 1
+        self.rowMasks = [0] * n
+        self.colMasks = [0] * n
+        self.subgridMasks = [0] * n
+        self.empty = 0
+        self.trail = []
+        positions = boardTables(n)[0]
+        for c, x in enumerate(self.cells):
+            if x == 0:
+                self.empty += 1
+            else:
+                i, j, b = positions[c]
+                bit = 1 << (x - 1)
+                self.rowMasks[i] |= bit
+                self.colMasks[j] |= bit
+                self.subgridMasks[b] |= bit
+
+    def subgrid(self, i, j):
+        """
+        Index of the sub grid holding position i, j (sub grids numbered row by row)
+        """
+        return (i // self.k) * self.k + j // self.k
+
+    def mask(self, i, j):
+        """
+        Bitmask of the values that can be played at position i, j
+        """
+        return self.full & ~(self.rowMasks[i] | self.colMasks[j] | self.subgridMasks[self.subgrid(i, j)])
+
+    def options(self, i, j):
+        """
+        List of the values that can be played at position i, j
+        """
+        return maskValues(self.mask(i, j))
+
+    def place(self, i, j, x):
+        """
+        Play value x at empty position i, j
+        """
+        bit = 1 << (x - 1)
+        self.cells[i * self.n + j] = x
+        self.rowMasks[i] |= bit
+        self.colMasks[j] |= bit
+        self.subgridMasks[self.subgrid(i, j)] |= bit
+        self.empty -= 1
+        self.trail.append((i, j))
+
+    def unplace(self, i, j):
+        """
+        Clear the value at position i, j
+        """
+        c = i * self.n + j
+        notBit = ~(1 << (self.cells[c] - 1))
+        self.cells[c] = 0
+        self.rowMasks[i] &= notBit
+        self.colMasks[j] &= notBit
+        self.subgridMasks[self.subgrid(i, j)] &= notBit
+        self.empty += 1
+
+    def mark(self):
+        """
+        Current position on the trail, to undo() back to later
+        """
+        return len(self.trail)
+
+    def undo(self, mark):
+        """
+        Clear every value placed since mark, most recent first
+        """
+        trail = self.trail
+        while len(trail) > mark:
+            i, j = trail.pop()
+            self.unplace(i, j)
+
+    def rowOptionsMask(self, i, jExclude):
+        """
+        Bitmask of every value allowed at the empty positions on row i (excluding jExclude)
+        """
+        optionsMask = 0
+        for j in range(self.n):
+            if j != jExclude and self.cells[i * self.n + j] == 0:
+                optionsMask |= self.mask(i, j)
+        return optionsMask
+
+    def colOptionsMask(self, iExclude, j):
+        """
+        Bitmask of every value allowed at the empty positions on col j (excluding iExclude)
+        """
+        optionsMask = 0
+        for i in range(self.n):
+            if i != iExclude and self.cells[i * self.n + j] == 0:
+                optionsMask |= self.mask(i, j)
+        return optionsMask
+
+    def subgridOptionsMask(self, i, j):
+        """
+        Bitmask of every value allowed at the empty positions in the sub grid at i, j
+        (excluding i, j itself)
+        """
+        optionsMask = 0
+        row1 = (i // self.k) * self.k
+        col1 = (j // self.k) * self.k
+        for rowRef in range(row1, row1 + self.k):
+            for colRef in range(col1, col1 + self.k):
+                if (rowRef != i or colRef != j) and self.cells[rowRef * self.n + colRef] == 0:
+                    optionsMask |= self.mask(rowRef, colRef)
+        return optionsMask
+
+def subgridValues(board, row, col):
+    """
+    Generate a list of values within a sub grid of the board
+
+    Args:
+        board (int array): sudoku board
+        row (int): row position to find the sub array
+        col (int): col position to find the sub array
+
+    Returns:
+        int array: list of values within the sub array
+    """
+    n, cells = boardCells(board)
+    subgridLen = math.isqrt(n)
+    row1 = row // subgridLen
+    col1 = col // subgridLen
+    valuesList = []
+    for row2 in range(subgridLen):
+        rowRef = (row1 * subgridLen) + row2
+        for col2 in range(subgridLen):
+            colRef = (col1 * subgridLen) + col2
+            num = cells[rowRef * n + colRef]
+            if num != 0:
+                valuesList.append(num)
+    return valuesList
+
+def colRowValues(board, row, col):
+    """
+    Generate a list of values on a board for a specified row and column
+
+    Args:
+        board (int array): sudoku board
+        row (int): row position to find the board values
+        col (int): col position to find the board values
+
+    Returns:
+        int array: list of values on the board along a given row and col
+    """
+    rowColValues = []
+    for i in range(len(board)):
+        if board[row][i] != 0:
+            rowColValues.append(board[row][i])
+        if board[i][col] != 0:
+            rowColValues.append(board[i][col])
+    return rowColValues
+
+def checkBoardCompleted(board):
+    """
+    Check if the board is completed / solved
+
+    Args:
+        board (int array): sudoku board
+
+    Returns:
+        bool: True if board is solved; False otherwise
+    """
+    if isinstance(board, Board):
+        return 0 not in board.cells
+    for i in range(len(board)):
+        for j in range(len(board)):
+            if board[i][j] == 0:
+                return False
+    return True
+
+def solve(board, solutions = 1, engine = "backtrack", cache = None, timer = None):
+    """
+    Solve sudoku board via the chosen solver engine (calls backtracking function by default)
+    Times solve time for benchmarking
+
+    Args:
+        board (int array): sudoku board to solve
+        solutions (int, optional): Only return solutions number of solved boards. Defaults to 1.
+        engine (str, optional): solver engine, one of SOLVER_ENGINES.  Defaults to "backtrack".
+        cache (SolutionCache, optional): answer from (and add to) this cache. Defaults to None.
+        timer (function, optional): called with the solve time in seconds. Defaults to None.
+
+    Returns:
+        int array: solved sudoku board
+    """
+    if engine not in SOLVER_ENGINES:
+        raise ValueError("Unknown solver engine '{}'".format(engine))
+
+    startTime = timeit.default_timer()
+    if cache is not None:
+        board = cache.solve(board, solutions, engine)
+    else:
+        board = SOLVER_ENGINES[engine](board, solutions)
+
+    endTime = timeit.default_timer()
+    if timer is not None:
+        timer(endTime - startTime)
+
+    return board[0]
+
+def backtrack(board, solutions = 1, branching = "auto", tieBreak = "first", stats = None):
+    """
+    Solve a sudoku board via backtracking
+
+    Inference
+    Use inference to solve board as much as possible until "stuck"; then make a single "smart guess";
+    and again, infer as much as possible.  This approach replicates actual human behavior in solving
+    Sudoku and substantially reduces computational complexity, enabling solving the larger / more
+    complex boards in reasonable time.  Inference requires no recursion/backtracking to implement and
+    thus is highly efficient, especially where we may traverse long "dead end" recursive branches for
+    the larger and more difficult boards.
+
+    Backtracking
+    Base case is a solved board added to results list.
+    For backtracking, select the first empty (zero-value) cell and obtain the list of valid options.
+    Then recursively iterate over these options until reaching base-case and return the solved board
+    to results list.
+
+    Branching
+    "quickHint" guesses at the empty cell whose row and col are the most filled.  "mrv" (minimum
+    remaining values) guesses at the empty cell with the fewest options, with ties broken by
+    tieBreak, so a cell left with no options ends the branch immediately.  "quickHint" is only
+    quick on small boards: on an empty 25 x 25 board it runs for minutes where "mrv" takes a
+    fraction of a second, so "auto" uses "mrv" from MRV_WIDTH up.
+
+    Args:
+        board (int array): current state of the sudoku board
+        solutions (int, optional): Only return solutions number of solved boards. Defaults to 1.
+        branching (str, optional): how the cell to guess at is chosen, one of BRANCHING, or
+                                   "auto" for "mrv" on boards MRV_WIDTH wide and bigger and
+                                   "quickHint" below.  Defaults to "auto".
+        tieBreak (str or function, optional): for "mrv", one of TIE_BREAKS or a function taking
+                                              (cands, cells) and returning one of the tied cells.
+                                              Defaults to "first".
+        stats (dict, optional): if given, stats["nodes"] is increased by the number of search
+                                nodes explored.  Defaults to None.
+
+    Returns:
+        int array (array of solved boards): solved sudoku boards
+    """
+    if branching == "auto":
+        branching = "mrv" if len(board) >= MRV_WIDTH else "quickHint"
+    if branching not in BRANCHING:
+        raise ValueError("Unknown branching heuristic '{}'".format(branching))
+    if PROFILER is not None:
+        PROFILER.count("backtrack")
+    res = []
+    for solved in searchSolutions(Candidates(Board.fromGrid(board)), branching, tieBreak, stats = stats):
+        if PROFILER is not None:
+            PROFILER.count("copies")
+        res.append(copyLike(solved, board))
+        if len(res) >= solutions: # Only return "solutions" number of solved boards
+            break
+    return res
+
+def iterSolutions(board, encoded = False, branching = "mrv"):
+    """
+    Generate the solutions of a board one at a time, as each is found
+
+    Nothing is searched ahead of the solution being yielded, and every solution is written to the
+    same board, so stopping early costs nothing and memory does not grow with the number of
+    solutions taken.
+
+    Args:
+        board (Board or int array): sudoku board; left unchanged
+        encoded (bool, optional): yield each solution as bytes (the n * n values row by row, as
+                                  Board(n, cells) takes) that can be kept.  Defaults to False.
+        branching (str, optional): how the cell to guess at is chosen, one of BRANCHING.
+                                   Defaults to "mrv".
+
+    Yields:
+        Board: one reused board holding the latest solution, overwritten when the next one is
+        asked for (copy it to keep it); or bytes if encoded
+    """
+    if branching not in BRANCHING:
+        raise ValueError("Unknown branching heuristic '{}'".format(branching))
+    n, cells = boardCells(board)
+    for solved in searchSolutions(Candidates(Board(n, cells)), branching):
+        if encoded:
+            yield bytes(solved.cells)
+        else:
+            yield solved
+
+def countSolutions(board, limit = 2, nodeBudget = None, timeout = None):
+    """
+    Count the solutions of a board, up to limit, without keeping any of them
+
+    The search stops as soon as limit solutions are found, or once it has explored nodeBudget
+    search nodes or run for timeout seconds, so even a hostile board (nearly empty, or with no
+    solution only found deep in the search) is answered in bounded time.  Clues that break the
+    rules are reported as "none" without searching.
+
+    Args:
+        board (Board or int array): sudoku board; left unchanged
+        limit (int, optional): stop once this many solutions are found; 2 tells a unique solution
+                               from several, 1 only asks if there is one.  Defaults to 2.
+        nodeBudget (int, optional): search nodes allowed. Defaults to None (no limit).
+        timeout (float, optional): seconds allowed. Defaults to None (no limit).
+
+    Returns:
+        tuple: (status, count) where status is "unique" (the whole search found one solution),
+        "multiple", "none", "solvable" (limit 1 was reached, so uniqueness is unknown) or
+        "budget exceeded" (the search stopped before telling them apart), and count the
+        solutions found (at most limit; a lower bound if the budget was exceeded)
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1, not {}".format(limit))
+    n, cells = boardCells(board)
+    if any(x > n for x in cells):
+        raise ValueError("Values on a {} x {} board must be at most {}".format(n, n, n))
+    cands = Candidates(Board(n, cells))
+    if not cluesConsistent(cands):
+        return ("none", 0)
+
+    deadline = None
+    if timeout is not None:
+        deadline = timeit.default_timer() + timeout
+    count = 0
+    complete = True
+    try:
+        for solved in searchSolutions(cands, "mrv", stats = {}, nodeBudget = nodeBudget, deadline = deadline):
+            count += 1
+            if count >= limit:
+                complete = False
+                break
+    except SearchBudgetExceeded:
+        if count < 2:
+            return ("budget exceeded", count)
+    if count >= 2:
+        return ("multiple", count)
+    if not complete:
+        return ("solvable", 1)
+    return ("unique", 1) if count == 1 else ("none", 0)
+
+def cluesConsistent(cands):
+    """
+    Check that no value is repeated in a row, col or sub grid of a board
+
+    Args:
+        cands (Candidates): candidate tracking for the board
+
+    Returns:
+        bool: True if every row, col and sub grid holds each value at most once
+    """
+    # Repeated Values Only Set Their Bit Once
+    filled = cands.n * cands.n - cands.empty
+    for masks in (cands.rowMasks, cands.colMasks, cands.subgridMasks):
+        if sum(mask.bit_count() for mask in masks) != filled:
+            return False
+    return True
+
+def searchSolutions(cands, branching = "quickHint", tieBreak = "first", shuffle = False, placed = None,
+                    stats = None, nodeBudget = None, depth = 0, deadline = None):
+    """
+    Backtracking search that changes one shared board in place
+
+    Every placement, guessed or inferred, is recorded on the candidate trail, so leaving a branch
+    rolls the board back exactly to its choice point with cands.undo() instead of keeping a copy
+    of the board for every option.  After a guess only the consequences of that guess are
+    propagated, and a branch is dropped as soon as propagation finds a contradiction.  Choice
+    points are kept on an explicit stack rather than by recursion, so boards needing more than
+    a thousand guesses deep (36 x 36 and bigger) do not hit the recursion limit.
+
+    Args:
+        cands (Candidates): candidate tracking for the board to solve
+        branching (str, optional): how the cell to guess at is chosen, one of BRANCHING.
+                                   Defaults to "quickHint".
+        tieBreak (str or function, optional): tie breaking for "mrv" branching. Defaults to "first".
+        shuffle (bool, optional): try the options at each guess in random order. Defaults to False.
+        placed (list, optional): positions guessed since the board was last propagated.
+                                 Defaults to None, propagating the whole board.
+        stats (dict, optional): stats["nodes"] counts the search nodes explored. Defaults to None.
+        nodeBudget (int, optional): raise SearchBudgetExceeded once stats["nodes"] passes this
+                                    (stats is then required).  Defaults to None (no limit).
+        depth (int, optional): number of guesses made above this search node. Defaults to 0.
+        deadline (float, optional): raise SearchBudgetExceeded once timeit.default_timer() passes
+                                    this.  Defaults to None (no limit).
+
+    Yields:
+        Board: the shared board (cands.board) each time it is solved.  Copy it to keep it, as it is
+        changed again when the search resumes.
+    """
+    # Each Choice Point Is [mark, row, col, options, next option, mark before the guess]
+    choicePoints = []
+    baseDepth = depth
+    while True:
+
+        # Search Node: Propagate The Last Guess (Or The Whole Board At The Start)
+        if stats is not None:
+            stats["nodes"] = stats.get("nodes", 0) + 1
+            if nodeBudget is not None and stats["nodes"] > nodeBudget:
+                raise SearchBudgetExceeded()
+        if deadline is not None and timeit.default_timer() > deadline:
+            raise SearchBudgetExceeded()
+        mark = cands.mark()
+        consistent = propagate(cands, placed)
+        if PROFILER is not None:
+            PROFILER.count("searchNodes")
+            PROFILER.count("propagate")
+            PROFILER.count("cellsPropagated", cands.mark() - mark)
+            PROFILER.reachDepth(depth)
+        if consistent and cands.empty == 0:
+            yield cands.board
+        if consistent and cands.empty > 0:
+            if branching == "mrv":
+                row, col = minimumRemainingValues(cands, tieBreak)
+            elif branching == "random":
+                row, col = randomPosition(cands.board)
+            else:
+                row, col = quickHint(cands.board)
+            optionsList = cands.options(row, col)
+            if shuffle:
+                random.shuffle(optionsList)
+            choicePoints.append([mark, row, col, optionsList, 0, None])
+        else:
+            cands.undo(mark)
+
+        # Backtrack To The Latest Choice Point With An Option Left, And Guess It
+        while choicePoints:
+            choicePoint = choicePoints[-1]
+            mark, row, col, optionsList, nextOption, guessMark = choicePoint
+            if guessMark is not None:
+                cands.undo(guessMark)
+                if PROFILER is not None:
+                    PROFILER.count("backtracks")
+            if nextOption < len(optionsList):
+                choicePoint[4] = nextOption + 1
+                choicePoint[5] = cands.mark()
+                cands.place(row, col, optionsList[nextOption])
+                placed = [(row, col)]
+                depth = baseDepth + len(choicePoints)
+                break
+            choicePoints.pop()
+            cands.undo(mark)
+        else:
+            return
+
+class SearchBudgetExceeded(Exception):
+    """
+    Raised by searchSolutions() when the search explores more nodes than its budget or runs past
+    its deadline.  The board is left part way through the search; undo() to a mark taken before
+    the search to restore it.
+    """
+
+def minimumRemainingValues(cands, tieBreak = "first"):
+    """
+    Find the empty position with the fewest valid options (minimum remaining values)
+
+    Stops at the first position with no options at all, as the board cannot be solved from there.
+
+    Args:
+        cands (Candidates): candidate tracking for the board
+        tieBreak (str or function, optional): one of TIE_BREAKS, or a function taking (cands, cells)
+                                              and returning one of the tied cells. Defaults to "first".
+
+    Returns:
+        int: row and col position with the fewest options; None, None if the board is completed
+    """
+    cells = cands.cells
+    full = cands.full
+    rowMasks = cands.rowMasks
+    colMasks = cands.colMasks
+    subgridMasks = cands.subgridMasks
+    positions = boardTables(cands.n)[0]
+    minOptions = cands.n + 1
+    tied = []
+    for c, (i, j, b) in enumerate(positions):
+        if cells[c] == 0:
+            optionCount = (full & ~(rowMasks[i] | colMasks[j] | subgridMasks[b])).bit_count()
+            if optionCount < minOptions:
+                minOptions = optionCount
+                tied = [c]
+                if optionCount == 0:
+                    break
+            elif optionCount == minOptions:
+                tied.append(c)
+    if not tied:
+        return None, None
+    if len(tied) == 1:
+        c = tied[0]
+    elif callable(tieBreak):
+        c = tieBreak(cands, tied)
+    else:
+        c = TIE_BREAKS[tieBreak](cands, tied)
+    return positions[c][0], positions[c][1]
+
+def tieBreakFirst(cands, cells):
+    """
+    Break MRV ties by taking the first tied cell (row by row)
+    """
+    return cells[0]
+
+def tieBreakRandom(cands, cells):
+    """
+    Break MRV ties by taking a random tied cell
+    """
+    return random.choice(cells)
+
+def tieBreakDegree(cands, cells):
+    """
+    Break MRV ties by taking the tied cell with the most empty peers (degree heuristic), as a guess
+    there constrains the most other cells
+    """
+    values = cands.cells
+    peers = boardTables(cands.n)[3]
+    bestCell = cells[0]
+    maxDegree = -1
+    for c in cells:
+        degree = 0
+        for p in peers[c]:
+            if values[p] == 0:
+                degree += 1
+        if degree > maxDegree:
+            maxDegree = degree
+            bestCell = c
+    return bestCell
+
+TIE_BREAKS = {
+    "first": tieBreakFirst,
+    "random": tieBreakRandom,
+    "degree": tieBreakDegree,
+}
+
+# Branching Heuristics For searchSolutions()
+BRANCHING = ("quickHint", "mrv", "random")
+
+# Board Width From Which backtrack() "auto" Branching Uses "mrv"
+MRV_WIDTH = 16
+
+def quickHint(board):
+    """
+    Quickly find the best position for a hint based on the heuristic that the row or col
+    with the lowest number of empty values would be the best place for the next guess
+
+    Args:
+        board (int array): sudoku board
+
+    Returns:
+        int: row and col position with the highest count (lowest empty positions)
+    """
+    n, cells = boardCells(board)
+    positions = boardTables(n)[0]
+    rowCount=[0]*n
+    colCount=[0]*n
+
+    # Count Values in Rows and Cols
+    for c, (i, j, b) in enumerate(positions):
+        if cells[c] != 0:
+            rowCount[i] += 1
+            colCount[j] += 1
+
+    # Find Max (The First Empty Position If No Row Or Col Has Values Yet)
+    maxValue = -1
+    maxRow = None
+    maxCol = None
+    for c, (i, j, b) in enumerate(positions):
+        if cells[c] == 0:
+            if rowCount[i] + colCount[j] > maxValue:
+                maxValue = rowCount[i] + colCount[j]
+                maxRow = i
+                maxCol = j
+
+    return maxRow, maxCol
+
+def inferred(board):
+    """
+    Check each non-solved position and attempt to solved via "Forward Single" or "Backward Single" methods
+
+    Args:
+        board (int array): sudoku board to solve
+
+    Returns:
+        int array: new Sudoku board with all values field from input board plus all values that can be
+        inferred by repeated application of forward and backward single rule
+    """
+    cands = Candidates(Board.fromGrid(board))
+    propagate(cands)
+    if PROFILER is not None:
+        PROFILER.count("inferred")
+        PROFILER.count("copies")
+        PROFILER.count("propagate")
+        PROFILER.count("cellsPropagated", cands.mark())
+    return cands.board if isinstance(board, Board) else cands.board.toGrid()
+
+def propagate(cands, placed = None):
+    """
+    Fill cands.board in place with every value found by repeated application of the forward and
+    backward single rule, working from a queue of what has changed rather than rescanning the board
+
+    When a value is placed only its empty peers are queued for a forward single check, and only
+    the units (rows, cols and sub grids) that can have lost that value as an option are queued for
+    a backward single check of that value.  Each value is placed through cands so it is recorded on
+    the trail.
+
+    Args:
+        cands (Candidates): candidate tracking for the board to fill
+        placed (list, optional): row, col positions placed since the board was last propagated.
+                                 Defaults to None, checking every empty cell and unit.
+
+    Returns:
+        bool: False if a contradiction was found (a cell with no options, or a value with no
+        position left in a unit); True otherwise
+    """
+    cells = cands.cells
+    n = cands.n
+    full = cands.full
+    rowMasks = cands.rowMasks
+    colMasks = cands.colMasks
+    subgridMasks = cands.subgridMasks
+    unitMasks = (rowMasks, colMasks, subgridMasks)
+    positions, units, cellUnits, peers = boardTables(n)
+
+    # Queue Cells To Check For Forward Singles And Units (With Values) For Backward Singles
+    cellQueue = []
+    unitQueue = {}
+    if placed is None:
+        cellQueue = [c for c in range(n * n) if cells[c] == 0]
+        unitQueue = dict.fromkeys(range(3 * n), full)
+        placed = []
+    newlyPlaced = [(i * n + j, 1 << (cells[i * n + j] - 1)) for i, j in placed]
+
+    while True:
+        # Queue The Consequences Of Each Placement
+        for c, bit in newlyPlaced:
+            for u in cellUnits[c]:
+                unitQueue[u] = full
+            for p in peers[c]:
+                if cells[p] == 0:
+                    cellQueue.append(p)
+                    for u in cellUnits[p]:
+                        unitQueue[u] = unitQueue.get(u, 0) | bit
+        newlyPlaced = []
+
+        # Forward Single
+        if cellQueue:
+            c = cellQueue.pop()
+            if cells[c] == 0:
+                i, j, b = positions[c]
+                optionsMask = full & ~(rowMasks[i] | colMasks[j] | subgridMasks[b])
+                if optionsMask == 0:
+                    return False
+                if optionsMask & (optionsMask - 1) == 0:
+                    cands.place(i, j, optionsMask.bit_length())
+                    newlyPlaced.append((c, optionsMask))
+            continue
+        if not unitQueue:
+            return True
+
+        # Backward Single
+        u, checkMask = unitQueue.popitem()
+        checkMask &= ~unitMasks[u // n][u % n]
+        if checkMask == 0:
+            continue
+        once = 0
+        twice = 0
+        for c in units[u]:
+            if cells[c] == 0:
+                i, j, b = positions[c]
+                optionsMask = checkMask & ~(rowMasks[i] | colMasks[j] | subgridMasks[b])
+                twice |= once & optionsMask
+                once |= optionsMask
+        if checkMask & ~once:
+            return False
+        singles = once & ~twice
+        while singles:
+            bit = singles & -singles
+            singles ^= bit
+            for c in units[u]:
+                i, j, b = positions[c]
+                if cells[c] == 0 and not (rowMasks[i] | colMasks[j] | subgridMasks[b]) & bit:
+                    cands.place(i, j, bit.bit_length())
+                    newlyPlaced.append((c, bit))
+                    break
+            else:
+                return False
+
+def boardTables(n):
+    """
+    Index tables for an n by n board, built once per board size
+
+    Cells are numbered row by row (cell c is at row c // n, col c % n).  Units are numbered rows
+    first, then cols, then sub grids, so unit u is row u, col u - n or sub grid u - 2n.
+
+    Args:
+        n (int): board width
+
+    Returns:
+        tuple: (positions, units, cellUnits, peers) where positions[c] is the (row, col, sub grid)
+        of cell c, units[u] the cells in unit u, cellUnits[c] the three units holding cell c, and
+        peers[c] every other cell sharing a unit with cell c
+    """
+    if n not in BOARD_TABLES:
+        k = math.isqrt(n)
+        positions = [(c // n, c % n, (c // n // k) * k + (c % n) // k) for c in range(n * n)]
+        units = [[] for u in range(3 * n)]
+        for c, (i, j, b) in enumerate(positions):
+            units[i].append(c)
+            units[n + j].append(c)
+            units[2 * n + b].append(c)
+        cellUnits = [(i, n + j, 2 * n + b) for (i, j, b) in positions]
+        peers = []
+        for c in range(n * n):
+            cellPeers = set()
+            for u in cellUnits[c]:
+                cellPeers.update(units[u])
+            cellPeers.discard(c)
+            peers.append(tuple(sorted(cellPeers)))
+        BOARD_TABLES[n] = (positions, units, cellUnits, peers)
+    return BOARD_TABLES[n]
+
+BOARD_TABLES = {}
+
+def valueBySingle(board, i, j, cands = None):
+    """
+    Check if position i, j can be solved by either "Forward Single" or "Backward Single" methods
+
+    Forward Single:  Find if a row, col or sub grid has only one value remaining
+    Backward Single: For the allowable options for a cell, find if, given the the row, col or sub
+                     grid allowable options, a value exists that can only be played at that cell
+
+    Args:
+        board (int array): sudoku board
+        i (int): row position
+        j (int): column position
+        cands (Candidates, optional): candidate tracking for board.  Built from board if not given.
+
+    Returns:
+        int array: The correct value for field (i, j) in board if it can be inferred as either
+        a forward or a backward single; or None otherwise.
+    """
+    if PROFILER is not None:
+        PROFILER.count("valueBySingle")
+    if cands is None:
+        cands = Candidates(board)
+
+    # Check Forward Single
+    optionsMask = cands.mask(i, j)
+    if optionsMask == 0:
+        return None
+    if optionsMask & (optionsMask - 1) == 0:
+        return optionsMask.bit_length()
+
+    # If No Forward Single, Check Forward Backward (Lowest Value Only Playable At i, j)
+
+    # Check Rows
+    singles = optionsMask & ~cands.rowOptionsMask(i, j)
+    if singles:
+        return (singles & -singles).bit_length()
+
+    # Check Columns
+    singles = optionsMask & ~cands.colOptionsMask(i, j)
+    if singles:
+        return (singles & -singles).bit_length()
+
+    # Check Subgrid
+    singles = optionsMask & ~cands.subgridOptionsMask(i, j)
+    if singles:
+        return (singles & -singles).bit_length()
+
+    return None
+
+def optionsInRow(board, i, j_exclude):
+    """
+    Generate a unique list of all allowed values for all positions on the the row i
+    Ignore position j_exclude
+
+    Args:
+        board (int array): sudoku board
+        i (int): row to check
+        j_exclude (int): row position to exclude
+
+    Returns:
+        int array: List of allowed values for each cell on row i (excluding j_exclude)
+    """
+    return maskValues(Candidates(board).rowOptionsMask(i, j_exclude))
+
+def optionsInCol(board, i_exclude, j):
+    """
+    Generate a unique list of all allowed values for all positions on the the col j
+    Ignore position i_exclude
+
+    Args:
+        board (int array): sudoku board
+        i_exclude (int): col position to exclude
+        j (int): col to check
+
+    Returns:
+        int array: List of allowed values for each cell on col j (excluding i_exclude)
+    """
+    return maskValues(Candidates(board).colOptionsMask(i_exclude, j))
+
+def optionsInSubgrid(board, i, j):
+    """
+    Generate a unique list of all allowed values for all positions with the sub grid found at
+    location i, j.  Ignores the cell i, j
+
+    Args:
+        board (int array): sudoku board
+        i (int): row location to find sub array
+        j (int): col location to find sub array
+
+    Returns:
+        int array: List of allowed values for each cell with the sub grid at i, j (excluding i, j itself)
+    """
+    return maskValues(Candidates(board).subgridOptionsMask(i, j))
+
+def grade(board):
+    """
+    Grade the difficulty of a board by the human solving techniques needed to solve it
+
+    The board is solved by LogicGrid, trying the techniques in TECHNIQUES in order of cost and
+    going back to the cheapest whenever one makes progress.  When none applies, a value is
+    guessed at the position with the fewest options and solving carries on from there, trying
+    the next option on a contradiction.  The difficulty is set by the hardest technique used, or
+    is "expert" if any guess was needed.
+
+    Args:
+        board (Board or int array): sudoku board
+
+    Returns:
+        dict: "difficulty" (one of DIFFICULTIES, or "unsolvable" if the board has no solution),
+        "technique" (hardest of TECHNIQUES used), "guesses" (number of values guessed, including
+        wrong ones) and "steps" (number of times each technique made progress)
+    """
+    steps = dict.fromkeys(TECHNIQUES, 0)
+    steps["guesses"] = 0
+    solved = LogicGrid(board).solve(steps)
+    guesses = steps.pop("guesses")
+    technique = "singles"
+    for name in TECHNIQUES:
+        if steps[name]:
+            technique = name
+    if solved is None:
+        difficulty = "unsolvable"
+    elif guesses:
+        difficulty = "expert"
+    else:
+        difficulty = TECHNIQUE_DIFFICULTY[technique]
+    return {"difficulty": difficulty, "technique": technique, "guesses": guesses, "steps": steps}
+
+# Solving Techniques Used By grade(), In Order Of Cost
+TECHNIQUES = ("singles", "pairs", "triples", "pointing", "xwing")
+
+# Difficulty Of A Board Solved Without Guessing, By The Hardest Technique It Needs
+TECHNIQUE_DIFFICULTY = {
+    "singles": "easy",
+    "pairs": "medium",
+    "triples": "medium",
+    "pointing": "hard",
+    "xwing": "hard",
+}
+
+# Difficulties From Easiest; "expert" Boards Need Guessing
+DIFFICULTIES = ("easy", "medium", "hard", "expert")
+
+class LogicGrid:
+    """
+    Options left at each empty position of a board, narrowed by placed values and by the
+    eliminations of the solving techniques, for grade()
+
+    Unlike Candidates, which only knows the values placed in each row, col and sub grid, every
+    position keeps its own bitmask of options (bit x - 1 for value x, 0 once filled) so a
+    technique can remove an option from a single position.
+
+    Args:
+        board (Board or int array): sudoku board; left unchanged
+    """
+
+    def __init__(self, board):
+        n, cells = boardCells(board)
+        cands = Candidates(Board(n, cells))
+        self.n = n
+        self.full = cands.full
+        self.cells = cands.cells
+        self.masks = [0 if x else cands.mask(c // n, c % n) for c, x in enumerate(self.cells)]
+        self.empty = cands.empty
+
+    def copy(self):
+        """
+        Independent copy of the grid, to guess a value on
+        """
+        other = LogicGrid.__new__(LogicGrid)
+        other.n = self.n
+        other.full = self.full
+        other.cells = bytearray(self.cells)
+        other.masks = list(self.masks)
+        other.empty = self.empty
+        return other
+
+    def place(self, c, x):
+        """
+        Play value x at empty cell c, removing x from the options of its peers
+        """
+        notBit = ~(1 << (x - 1))
+        masks = self.masks
+        self.cells[c] = x
+        masks[c] = 0
+        for p in boardTables(self.n)[3][c]:
+            masks[p] &= notBit
+        self.empty -= 1
+
+    def solve(self, steps):
+        """
+        Solve the grid with deduce(), guessing when it gets stuck
+
+        Args:
+            steps (dict): counts of each technique that made progress and of "guesses", updated
+
+        Returns:
+            LogicGrid: the solved grid (this one or a guessed copy); None if there is no solution
+        """
+        solved = self.deduce(steps)
+        if solved is None:
+            return None
+        if solved:
+            return self
+
+        # Guess At The Position With The Fewest Options
+        masks = self.masks
+        c = min((c for c in range(self.n * self.n) if masks[c]), key = lambda c: masks[c].bit_count())
+        for x in maskValues(masks[c]):
+            steps["guesses"] += 1
+            trial = self.copy()
+            trial.place(c, x)
+            result = trial.solve(steps)
+            if result is not None:
+                return result
+        return None
+
+    def deduce(self, steps):
+        """
+        Apply the techniques in TECHNIQUES until the grid is solved or none makes progress
+
+        Args:
+            steps (dict): counts of each technique that made progress, updated
+
+        Returns:
+            bool: True if solved, False if stuck; None if a contradiction was found
+        """
+        while True:
+            placed = self.singles()
+            if placed is None:
+                return None
+            steps["singles"] += placed
+            if self.empty == 0:
+                return True
+            if self.subsets(2):
+                steps["pairs"] += 1
+            elif self.subsets(3):
+                steps["triples"] += 1
+            elif self.pointing():
+                steps["pointing"] += 1
+            elif self.xwing():
+                steps["xwing"] += 1
+            else:
+                return False
+
+    def singles(self):
+        """
+        Place every forward single (a position with one option) and backward single (a value with
+        one position left in a row, col or sub grid), as valueBySingle(), until none are left
+
+        Returns:
+            int: number of values placed; None if a contradiction was found
+        """
+        n = self.n
+        full = self.full
+        cells = self.cells
+        masks = self.masks
+        units = boardTables(n)[1]
+        placed = 0
+        while True:
+            progress = False
+
+            # Forward Singles
+            for c in range(n * n):
+                optionsMask = masks[c]
+                if optionsMask & (optionsMask - 1) == 0 and cells[c] == 0:
+                    if optionsMask == 0:
+                        return None
+                    self.place(c, optionsMask.bit_length())
+                    placed += 1
+                    progress = True
+
+            # Backward Singles
+            for unit in units:
+                once = 0
+                twice = 0
+                filled = 0
+                for c in unit:
+                    if cells[c]:
+                        filled |= 1 << (cells[c] - 1)
+                    else:
+                        twice |= once & masks[c]
+                        once |= masks[c]
+                if (once | filled) != full:
+                    return None
+                singles = once & ~twice & ~filled
+                while singles:
+                    bit = singles & -singles
+                    singles ^= bit
+                    for c in unit:
+                        if masks[c] & bit:
+                            self.place(c, bit.bit_length())
+                            placed += 1
+                            progress = True
+                            break
+                    else:
+                        return None
+            if not progress:
+                return placed
+
+    def subsets(self, size):
+        """
+        Naked subsets: size positions of a unit whose options are size values between them, so no
+        other position in the unit can take those values.  Hidden subsets: size values left at
+        only size positions of a unit, so those positions can take no other value.
+
+        Args:
+            size (int): 2 for pairs, 3 for triples
+
+        Returns:
+            bool: True if an option was removed
+        """
+        masks = self.masks
+        for unit in boardTables(self.n)[1]:
+            empty = [c for c in unit if masks[c]]
+            if len(empty) <= size:
+                continue
+
+            # Naked Subsets
+            small = [c for c in empty if masks[c].bit_count() <= size]
+            for group in itertools.combinations(small, size):
+                union = 0
+                for c in group:
+                    union |= masks[c]
+                if union.bit_count() == size:
+                    changed = False
+                    for c in empty:
+                        if c not in group and masks[c] & union:
+                            masks[c] &= ~union
+                            changed = True
+                    if changed:
+                        return True
+
+            # Hidden Subsets (Positions As Bits Of The Index Into empty)
+            places = {}
+            for index, c in enumerate(empty):
+                optionsMask = masks[c]
+                while optionsMask:
+                    bit = optionsMask & -optionsMask
+                    optionsMask ^= bit
+                    places[bit] = places.get(bit, 0) | (1 << index)
+            few = [bit for bit, where in places.items() if where.bit_count() <= size]
+            for group in itertools.combinations(few, size):
+                where = 0
+                valuesMask = 0
+                for bit in group:
+                    where |= places[bit]
+                    valuesMask |= bit
+                if where.bit_count() == size:
+                    changed = False
+                    for index, c in enumerate(empty):
+                        if where >> index & 1 and masks[c] & ~valuesMask:
+                            masks[c] &= valuesMask
+                            changed = True
+                    if changed:
+                        return True
+        return False
+
+    def pointing(self):
+        """
+        Pointing: a value left only on one row or col of a sub grid is removed from the rest of
+        that row or col.  Claiming: a value left only in one sub grid of a row or col is removed
+        from the rest of that sub grid.
+
+        Returns:
+            bool: True if an option was removed
+        """
+        n = self.n
+        masks = self.masks
+        positions, units, cellUnits, peers = boardTables(n)
+        for u, unit in enumerate(units):
+            unitType = u // n
+            valuesMask = 0
+            for c in unit:
+                valuesMask |= masks[c]
+            while valuesMask:
+                bit = valuesMask & -valuesMask
+                valuesMask ^= bit
+                where = [c for c in unit if masks[c] & bit]
+                if len(where) < 2:
+                    continue
+                # Sub Grids Can Point Along Rows Or Cols, Rows And Cols Only Claim Sub Grids
+                for otherType in ((0, 1) if unitType == 2 else (2,)):
+                    other = cellUnits[where[0]][otherType]
+                    if any(cellUnits[c][otherType] != other for c in where):
+                        continue
+                    changed = False
+                    for c in units[other]:
+                        if masks[c] & bit and cellUnits[c][unitType] != u:
+                            masks[c] &= ~bit
+                            changed = True
+                    if changed:
+                        return True
+        return False
+
+    def xwing(self):
+        """
+        X-wing: a value left at exactly the same two positions on two rows can only go in those
+        two cols, so it is removed from the rest of both cols (and the same with rows and cols
+        swapped).
+
+        Returns:
+            bool: True if an option was removed
+        """
+        n = self.n
+        masks = self.masks
+        units = boardTables(n)[1]
+        for lineType in (0, 1):
+            lines = units[lineType * n:(lineType + 1) * n]
+            crossLines = units[(1 - lineType) * n:(2 - lineType) * n]
+            for value in range(n):
+                bit = 1 << value
+                seen = {}
+                for line, cells in enumerate(lines):
+                    # Positions As Bits Of The Index Along The Line (The Cross Line Index)
+                    where = 0
+                    for index, c in enumerate(cells):
+                        if masks[c] & bit:
+                            where |= 1 << index
+                    if where.bit_count() != 2:
+                        continue
+                    if where not in seen:
+                        seen[where] = line
+                        continue
+                    changed = False
+                    for cross in maskValues(where):
+                        for index, c in enumerate(crossLines[cross - 1]):
+                            if index != line and index != seen[where] and masks[c] & bit:
+                                masks[c] &= ~bit
+                                changed = True
+                    if changed:
+                        return True
+        return False
+
+def dlx(board, solutions = 1, nodeBudget = None, stats = None):
+    """
+    Solve a sudoku board with the Dancing Links solver (sudoku_dlx.dlx(), loaded on first use)
+    """
+    import sudoku_dlx
+    return sudoku_dlx.dlx(board, solutions, nodeBudget, stats)
+
+def numpySolve(board, solutions = 1):
+    """
+    Solve a sudoku board with the NumPy solver (sudoku_numpy.numpySolve(), loaded on first use)
+    """
+    import sudoku_numpy
+    return sudoku_numpy.numpySolve(board, solutions)
+
+def portfolioSolve(board, solutions = 1, configurations = None, timeout = None, stats = None):
+    """
+    Solve a sudoku board by racing differently configured searches in separate processes
+    (sudoku_portfolio.portfolioSolve(), loaded on first use)
+    """
+    import sudoku_portfolio
+    return sudoku_portfolio.portfolioSolve(board, solutions, configurations, timeout, stats)
+
+# Solver Engines Selectable By Name, Each Called As engine(board, solutions)
+SOLVER_ENGINES = {
+    "backtrack": backtrack,
+    "dlx": dlx,
+    "numpy": numpySolve,
+    "portfolio": portfolioSolve,
+}
+
+def hasUniqueSolution(board, engine = "backtrack", cache = None):
+    """
+    Check if a board has exactly one solution
+
+    Args:
+        board (int array): sudoku board to check
+        engine (str, optional): solver engine, one of SOLVER_ENGINES.  Defaults to "backtrack".
+        cache (SolutionCache, optional): answer from (and add to) this cache. Defaults to None.
+
+    Returns:
+        bool: True if the board has one solution; False if it has none or several
+    """
+    if cache is not None:
+        return len(cache.solve(board, 2, engine)) == 1
+    return len(SOLVER_ENGINES[engine](board, 2)) == 1
+
+def canonicalForm(board, maxOrderings = 256):
+    """
+    Canonical form of a board under the sudoku symmetries: transposing, permuting bands (groups
+    of k rows), rows within a band, stacks (groups of k cols) and cols within a stack, and
+    relabelling the digits
+
+    Rows are ordered by keys that none of the symmetries change (the number of clues in the row
+    and the clue counts of the cols they are in), bands by the keys of their rows, and likewise
+    for cols and stacks.  Only orderings of tied rows, cols, bands and stacks are tried, with
+    both orientations, and digits are relabelled in order of first appearance; the smallest
+    result is the canonical form, so equivalent boards give the same one.  A board with more
+    than maxOrderings tied orderings (a very sparse or symmetric board) only has its digits
+    relabelled, so it still matches relabelled copies of itself.
+
+    Args:
+        board (Board or int array): sudoku board
+        maxOrderings (int, optional): most row and col orderings to try per orientation.
+                                      Defaults to 256.
+
+    Returns:
+        tuple: (key, transform) - key is the canonical board as bytes, row by row; transform
+        (transpose, rowOrder, colOrder, digitMap) maps the board onto it, for toCanonical()
+    """
+    n, cells = boardCells(board)
+    k = math.isqrt(n)
+    grid = [list(cells[i * n:(i + 1) * n]) for i in range(n)]
+    sources = (grid, [list(col) for col in zip(*grid)])
+    orderings = []
+    for source in sources:
+        rowCounts = [n - row.count(0) for row in source]
+        colCounts = [n - col.count(0) for col in zip(*source)]
+        rowKeys = [(rowCounts[i], sorted(colCounts[j] for j in range(n) if source[i][j])) for i in range(n)]
+        colKeys = [(colCounts[j], sorted(rowCounts[i] for i in range(n) if source[i][j])) for j in range(n)]
+        rowOrders = lineOrderings(rowKeys, k, maxOrderings)
+        colOrders = lineOrderings(colKeys, k, maxOrderings)
+        if rowOrders is None or colOrders is None or len(rowOrders) * len(colOrders) > maxOrderings:
+            orderings = None
+            break
+        orderings.append((rowOrders, colOrders))
+
+    if orderings is None:
+        # Too Many Ties, Only Relabel The Digits
+        identity = list(range(n))
+        return canonicalResult(grid, False, identity, identity)
+
+    best = None
+    for transpose, (rowOrders, colOrders) in enumerate(orderings):
+        for rowOrder in rowOrders:
+            for colOrder in colOrders:
+                result = canonicalResult(sources[transpose], bool(transpose), rowOrder, colOrder)
+                if best is None or result[0] < best[0]:
+                    best = result
+    return best
+
+def lineOrderings(keys, k, maxOrderings):
+    """
+    Every ordering of the rows (or cols) of a board that sorts the blocks of k lines (bands or
+    stacks) by their sorted line keys and the lines within each block by key, for canonicalForm()
+
+    Args:
+        keys (list): key of each line
+        k (int): lines per block
+        maxOrderings (int): give up past this many orderings
+
+    Returns:
+        list: the orderings, each a list of line indexes; None if there are more than maxOrderings
+    """
+    n = len(keys)
+    blocks = sorted(range(n // k), key = lambda block: sorted(keys[block * k:(block + 1) * k]))
+    blockGroups = [list(group) for key, group in
+                   itertools.groupby(blocks, key = lambda block: sorted(keys[block * k:(block + 1) * k]))]
+    count = math.prod(math.factorial(len(group)) for group in blockGroups)
+
+    # Orderings Of The Lines Within Each Block
+    lineChoices = {}
+    for block in range(n // k):
+        lines = sorted(range(block * k, (block + 1) * k), key = lambda line: keys[line])
+        groups = [list(group) for key, group in itertools.groupby(lines, key = lambda line: keys[line])]
+        count *= math.prod(math.factorial(len(group)) for group in groups)
+        if count > maxOrderings:
+            return None
+        lineChoices[block] = [sum(choice, []) for choice in
+                              itertools.product(*[[list(p) for p in itertools.permutations(group)]
+                                                  for group in groups])]
+
+    orderings = []
+    blockChoices = itertools.product(*[itertools.permutations(group) for group in blockGroups])
+    for blockChoice in blockChoices:
+        blockOrder = [block for group in blockChoice for block in group]
+        for lineChoice in itertools.product(*[lineChoices[block] for block in blockOrder]):
+            orderings.append(sum(lineChoice, []))
+    return orderings
+
+def canonicalResult(source, transpose, rowOrder, colOrder):
+    """
+    Key and transform for one ordering of the rows and cols tried by canonicalForm(), with the
+    digits relabelled in order of first appearance
+    """
+    n = len(source)
+    digitMap = [0] * (n + 1)
+    nextLabel = 1
+    values = []
+    for i in rowOrder:
+        row = source[i]
+        for j in colOrder:
+            x = row[j]
+            if x and not digitMap[x]:
+                digitMap[x] = nextLabel
+                nextLabel += 1
+            values.append(digitMap[x])
+
+    # Digits Missing From The Board Take The Remaining Labels In Order
+    for x in range(1, n + 1):
+        if not digitMap[x]:
+            digitMap[x] = nextLabel
+            nextLabel += 1
+    return bytes(values), (transpose, rowOrder, colOrder, digitMap)
+
+def toCanonical(board, transform):
+    """
+    Map a board (typically a solution) onto the canonical form given by canonicalForm()
+
+    Returns:
+        bytes: the mapped board, row by row
+    """
+    n, cells = boardCells(board)
+    transpose, rowOrder, colOrder, digitMap = transform
+    if transpose:
+        return bytes(digitMap[cells[j * n + i]] for i in rowOrder for j in colOrder)
+    return bytes(digitMap[cells[i * n + j]] for i in rowOrder for j in colOrder)
+
+def fromCanonical(values, transform):
+    """
+    Map a board in canonical form back with the inverse of transform (see toCanonical())
+
+    Returns:
+        Board: the board in the original orientation, rows, cols and digits
+    """
+    transpose, rowOrder, colOrder, digitMap = transform
+    n = len(rowOrder)
+    inverseMap = [0] * (n + 1)
+    for x in range(1, n + 1):
+        inverseMap[digitMap[x]] = x
+    board = Board(n)
+    cells = board.cells
+    c = 0
+    for i in rowOrder:
+        for j in colOrder:
+            if transpose:
+                cells[j * n + i] = inverseMap[values[c]]
+            else:
+                cells[i * n + j] = inverseMap[values[c]]
+            c += 1
+    return board
+
+class SolutionCache:
+    """
+    Cache of solved boards, shared between boards that are equivalent under the sudoku symmetries
+
+    Boards are looked up by canonicalForm(), so a board seen before, even with its digits
+    relabelled or its rows, cols, bands or stacks permuted or transposed, is answered by mapping
+    the cached solutions back instead of searching again.  Solutions are stored in canonical
+    form with the number asked for, so a cached search that found fewer solutions than asked for
+    is known to have found them all.  The most recently used entries are kept in memory, with
+    the least recently used evicted first; given a path, every entry is also kept in an SQLite
+    database, found again after eviction or in a later run.
+
+    Args:
+        capacity (int, optional): entries kept in memory. Defaults to 1024.
+        path (str, optional): SQLite database file for persistent entries. Defaults to None.
+    """
+
+    def __init__(self, capacity = 1024, path = None):
+        self.capacity = capacity
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if path is not None:
+            import sqlite3
+            self.db = sqlite3.connect(path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions "
+                            "(key BLOB PRIMARY KEY, solutions BLOB, searched INTEGER)")
+
+    def lookup(self, key):
+        """
+        Cached (solutions, searched) entry for a canonical key, or None
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        if self.db is not None:
+            row = self.db.execute("SELECT solutions, searched FROM solutions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                size = len(key)
+                entry = ([row[0][s:s + size] for s in range(0, len(row[0]), size)], row[1])
+                self.remember(key, entry)
+                return entry
+        return None
+
+    def remember(self, key, entry):
+        """
+        Keep an entry in memory, evicting the least recently used past capacity
+        """
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last = False)
+
+    def solve(self, board, solutions = 1, engine = "backtrack"):
+        """
+        Solve a board as SOLVER_ENGINES[engine](board, solutions) would, from the cache if it can
+
+        Returns:
+            int array (array of solved boards): solved sudoku boards, as Boards if given a Board
+        """
+        key, transform = canonicalForm(board)
+        entry = self.lookup(key)
+        if entry is not None and (len(entry[0]) >= solutions or len(entry[0]) < entry[1]):
+            self.hits += 1
+            return [copyLike(fromCanonical(values, transform), board) for values in entry[0][:solutions]]
+
+        self.misses += 1
+        solved = SOLVER_ENGINES[engine](board, solutions)
+        entry = ([toCanonical(solution, transform) for solution in solved], solutions)
+        self.remember(key, entry)
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)",
+                            (key, b"".join(entry[0]), solutions))
+            self.db.commit()
+        return solved
+
+    def hitRate(self):
+        """
+        Fraction of lookups answered from the cache (0 before any lookup)
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        """
+        Close the SQLite database, if any
+        """
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+class Profiler:
+    """
+    Hot path instrumentation, active while used as a context manager
+
+        with Profiler() as profiler:
+            generate(3)
+        print(profiler.summary())
+
+    While active, the solver counts calls to backtrack, generateRandom, inferred, propagate,
+    valueBySingle and options, search nodes, cells filled by propagation, backtracks (guesses
+    undone) and board copies, and records the deepest search recursion.  When no Profiler is
+    active each hook is a single check of PROFILER at function entry, so it costs nothing measurable.
+
+    Args:
+        dumpPath (str, optional): also run cProfile and write its pstats dump here on exit.
+                                  Defaults to None.
+    """
+
+    def __init__(self, dumpPath = None):
+        self.dumpPath = dumpPath
+        self.counters = collections.Counter()
+        self.maxDepth = 0
+        self.profile = None
+        self.previous = None
+
+    def __enter__(self):
+        global PROFILER
+        self.previous = PROFILER
+        PROFILER = self
+        if self.dumpPath is not None:
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        global PROFILER
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.dumpPath)
+        PROFILER = self.previous
+        return False
+
+    def count(self, name, amount = 1):
+        """
+        Add amount to the named counter
+        """
+        self.counters[name] += amount
+
+    def reachDepth(self, depth):
+        """
+        Record that the search recursed to depth
+        """
+        if depth > self.maxDepth:
+            self.maxDepth = depth
+
+    def summary(self):
+        """
+        Counters as aligned text, plus the top functions by cumulative time if cProfile ran
+
+        Returns:
+            str: the summary
+        """
+        lines = ["Profile:"]
+        for name, value in sorted(self.counters.items()):
+            lines.append("  {:<16} {:>12}".format(name, value))
+        lines.append("  {:<16} {:>12}".format("maxDepth", self.maxDepth))
+        if self.profile is not None:
+            lines.append("cProfile dump written to {}".format(self.dumpPath))
+        return "\n".join(lines)
+
+# Active Profiler, Or None When Not Profiling
+PROFILER = None
+
+def boardToLine(board):
+    """
+    Encode a board as a single line, one character per cell row by row, with '.' for empty cells
+    and values above 9 as letters (10 = 'A', see SYMBOLS).  A 9 x 9 board gives the common 81
+    character format.
+
+    Args:
+        board (int array): sudoku board
+
+    Returns:
+        str: the encoded board
+    """
+    n, cells = boardCells(board)
+    return "".join(SYMBOLS[x] for x in cells)
+
+def lineToBoard(line):
+    """
+    Decode a board written by boardToLine().  Empty cells may be '.' or '0'.
+
+    Args:
+        line (str): encoded board; its length must be a square of a square (16, 81, 256, 625 ...)
+
+    Returns:
+        int array: sudoku board
+    """
+    line = line.strip()
+    n = math.isqrt(len(line))
+    if n * n != len(line) or math.isqrt(n)**2 != n or n > MAX_WIDTH:
+        raise ValueError("A board line needs 16, 81, 256 ... {} cells, not {}".format(MAX_WIDTH**2, len(line)))
+    values = []
+    for symbol in line:
+        x = symbolValue(symbol, n)
+        if x is None:
+            raise ValueError("Invalid cell '{}' for a {} x {} board".format(symbol, n, n))
+        values.append(x)
+    return [values[i * n:(i + 1) * n] for i in range(n)]
+
+def symbolValue(symbol, n):
+    """
+    Value of a cell symbol (see SYMBOLS) on an n by n board.  '0' is also an empty cell, and
+    boards small enough to only use upper case letters accept lower case too.
+
+    Returns:
+        int: the value; None if symbol is not a valid cell for the board
+    """
+    if len(symbol) != 1:
+        return None
+    if symbol == "0":
+        return 0
+    if n < SYMBOLS.find("a"):
+        symbol = symbol.upper()
+    x = SYMBOLS.find(symbol)
+    if x < 0 or x > n:
+        return None
+    return x
+
+# Cell Symbols For Encoded Boards, Indexed By Value: Digits, Then Upper And Lower Case Letters
+SYMBOLS = ".123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+# Widest Board The Symbols Can Encode (49 x 49, k = 7)
+MAX_WIDTH = max(k * k for k in range(2, len(SYMBOLS)) if k * k < len(SYMBOLS))
@@ -0,0 +1,176 @@
+"""
+Sudoku NumPy batch solver, loaded by the "numpy" engine of sudoku_engine on first use.
+
+Author: Thomas O'Mara
+Date: 2024
+License: MIT License
+"""
+
+import math
+
+import sudoku_engine
+from sudoku_engine import Board, backtrack, boardCells
+
+def importNumpy():
+    """
+    Import NumPy for the batched engine, only when it is first used
+
+    Returns:
+        module: numpy
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("The numpy engine needs NumPy, install it with 'pip install numpy'") from None
+    return numpy
+
+def numpyBoards(boards):
+    """
+    Stack boards of one size into a new (batch, n, n) uint8 array
+
+    Args:
+        boards (list or array): Boards or int array boards, or a (batch, n, n) array
+
+    Returns:
+        array: the boards, one n by n grid of values per board (0 for empty)
+    """
+    np = importNumpy()
+    if isinstance(boards, np.ndarray):
+        return boards.astype(np.uint8)
+    if len(boards) == 0:
+        return np.zeros((0, 0, 0), dtype = np.uint8)
+    n = len(boards[0])
+    grids = np.empty((len(boards), n, n), dtype = np.uint8)
+    for b, board in enumerate(boards):
+        size, cells = boardCells(board)
+        if size != n:
+            raise ValueError("All boards in a batch must be the same size")
+        grids[b] = np.frombuffer(bytes(cells), dtype = np.uint8).reshape(n, n)
+    return grids
+
+def numpySinglesStep(grids, k):
+    """
+    One round of the forward and backward single rules over every cell of every board at once
+
+    The candidate tensor (batch, n, n, n) holds True where value x + 1 is allowed at a cell.  A
+    forward single is a cell with one candidate; a backward single is a value with one candidate
+    cell left in a row, col or sub grid.  All singles found are placed together, in place.  Cells
+    are viewed as (batch, sub grid row, row, sub grid col, col) so the row, col and sub grid
+    counts broadcast straight back over the cells.
+
+    Args:
+        grids (array): (batch, n, n) boards, changed in place
+        k (int): sub grid width
+
+    Returns:
+        tuple: (placed, contradiction) bool arrays, one entry per board - placed if any value was
+        placed, contradiction if the board has a repeated value, a cell with no options or a value
+        with no position left in a unit (such boards are left unchanged)
+    """
+    np = importNumpy()
+    batch, n = grids.shape[0], grids.shape[1]
+    values = np.arange(1, n + 1, dtype = grids.dtype)
+
+    # Count Each Value Placed In Every Row, Col And Sub Grid
+    filled = grids[..., None] == values
+    rowCounts = filled.sum(axis = 2, dtype = np.uint8).reshape(batch, k, k, 1, 1, n)
+    colCounts = filled.sum(axis = 1, dtype = np.uint8).reshape(batch, 1, 1, k, k, n)
+    subgridCounts = filled.reshape(batch, k, k, k, k, n).sum(axis = (2, 4), dtype = np.uint8, keepdims = True)
+    contradiction = ((rowCounts > 1).any(axis = (1, 2, 3, 4, 5)) | (colCounts > 1).any(axis = (1, 2, 3, 4, 5))
+                     | (subgridCounts > 1).any(axis = (1, 2, 3, 4, 5)))
+
+    # Candidate Tensor
+    empty = (grids == 0).reshape(batch, k, k, k, k, 1)
+    candidates = ~((rowCounts > 0) | (colCounts > 0) | (subgridCounts > 0)) & empty
+    flatCandidates = candidates.reshape(batch, n, n, n)
+
+    # Count The Options At Each Cell And The Positions For Each Value In Each Unit
+    optionCounts = flatCandidates.sum(axis = 3, dtype = np.uint8).reshape(batch, k, k, k, k, 1)
+    rowOptions = flatCandidates.sum(axis = 2, dtype = np.uint8).reshape(batch, k, k, 1, 1, n)
+    colOptions = flatCandidates.sum(axis = 1, dtype = np.uint8).reshape(batch, 1, 1, k, k, n)
+    subgridOptions = candidates.sum(axis = (2, 4), dtype = np.uint8, keepdims = True)
+    contradiction |= (empty & (optionCounts == 0)).any(axis = (1, 2, 3, 4, 5))
+    contradiction |= (((rowCounts == 0) & (rowOptions == 0)).any(axis = (1, 2, 3, 4, 5))
+                      | ((colCounts == 0) & (colOptions == 0)).any(axis = (1, 2, 3, 4, 5))
+                      | ((subgridCounts == 0) & (subgridOptions == 0)).any(axis = (1, 2, 3, 4, 5)))
+
+    # Forward Singles, Then Backward Singles In Rows, Cols And Sub Grids
+    singles = candidates & ((optionCounts == 1) | (rowOptions == 1) | (colOptions == 1) | (subgridOptions == 1))
+    singles &= ~contradiction.reshape(batch, 1, 1, 1, 1, 1)
+    singles = singles.reshape(batch, n, n, n)
+    place = singles.any(axis = 3)
+    grids[place] = singles.argmax(axis = 3)[place] + 1
+    return place.any(axis = (1, 2)), contradiction
+
+def numpyInferred(boards):
+    """
+    Vectorized inferred() for many boards: fill every board with the values found by repeated
+    application of the forward and backward single rule, as one (batch, n, n) array
+
+    Each round handles every cell of every board in a few array operations; only boards that
+    changed in the last round are worked on in the next.
+
+    Args:
+        boards (list or array): Boards or int array boards of one size, or a (batch, n, n) array
+
+    Returns:
+        tuple: (grids, contradiction) - the (batch, n, n) filled boards, and a bool array marking
+        the boards found to have no solution
+    """
+    np = importNumpy()
+    grids = numpyBoards(boards)
+    contradiction = np.zeros(len(grids), dtype = bool)
+    if len(grids) == 0:
+        return grids, contradiction
+    k = math.isqrt(grids.shape[1])
+    active = np.arange(len(grids))
+    while active.size:
+        activeGrids = grids[active]
+        placed, found = numpySinglesStep(activeGrids, k)
+        grids[active] = activeGrids
+        contradiction[active] = found
+        active = active[placed & ~found]
+        if sudoku_engine.PROFILER is not None:
+            sudoku_engine.PROFILER.count("numpyRounds")
+    return grids, contradiction
+
+def numpySolveBatch(boards, solutions = 1):
+    """
+    Solve many boards with the NumPy engine: numpyInferred() over the whole batch, then a
+    backtracking search only for the boards that inference leaves unsolved
+
+    Args:
+        boards (list): Boards or int array boards of one size
+        solutions (int, optional): Only return solutions number of solved boards per board.
+                                   Defaults to 1.
+
+    Returns:
+        list: for each board, its list of solved boards (empty if it has no solution)
+    """
+    grids, contradiction = numpyInferred(boards)
+    res = []
+    for b, grid in enumerate(grids):
+        if contradiction[b]:
+            solved = []
+        elif grid.all():
+            # Every Value Was Forced, So This Is The Only Solution
+            solved = [grid.tolist()]
+        else:
+            solved = backtrack(grid.tolist(), solutions)
+        if isinstance(boards[b], Board):
+            solved = [Board.fromGrid(board) for board in solved]
+        res.append(solved)
+    return res
+
+def numpySolve(board, solutions = 1):
+    """
+    Solve a single sudoku board with the NumPy engine (see numpySolveBatch())
+
+    Args:
+        board (int array): sudoku board to solve
+        solutions (int, optional): Only return solutions number of solved boards. Defaults to 1.
+
+    Returns:
+        int array (array of solved boards): solved sudoku boards
+    """
+    return numpySolveBatch([board], solutions)[0]
@@ -0,0 +1,143 @@
+"""
+Sudoku portfolio solver, racing differently configured searches in separate processes, loaded by
+the "portfolio" engine of sudoku_engine on first use.
+
+Author: Thomas O'Mara
+Date: 2024
+License: MIT License
+"""
+
+import multiprocessing
+import queue
+import random
+import timeit
+
+from sudoku_engine import Board, Candidates, SearchBudgetExceeded, boardCells, copyLike, searchSolutions
+
+def portfolioSolve(board, solutions = 1, configurations = None, timeout = None, stats = None):
+    """
+    Solve a sudoku board by racing several differently configured searches, one per process,
+    taking the first to finish and terminating the rest
+
+    Backtracking run times are heavy tailed: a board one branching order takes seconds over is
+    often solved in milliseconds by another.  Racing a portfolio of orders (and randomised
+    searches restarted with growing node budgets) cuts the tail to that of the luckiest one.
+    Every search is complete, so the winner's result is as exact as backtrack()'s, whether it
+    found solutions or proved there are none left.
+
+    Inside a daemon process (eg a worker of a batch solve pool), which cannot start processes of
+    its own, the first configuration is run in place instead.
+
+    Args:
+        board (Board or int array): sudoku board to solve
+        solutions (int, optional): Only return solutions number of solved boards. Defaults to 1.
+        configurations (list, optional): searches to race, as dicts like those in PORTFOLIO.
+                                         Defaults to PORTFOLIO.
+        timeout (float, optional): seconds to wait for the first search to finish before raising
+                                   SearchBudgetExceeded. Defaults to None (no limit).
+        stats (dict, optional): stats["winner"] is set to the index of the configuration that
+                                finished first. Defaults to None.
+
+    Returns:
+        int array (array of solved boards): solved sudoku boards, as Boards if given a Board
+    """
+    if configurations is None:
+        configurations = PORTFOLIO
+    n, cells = boardCells(board)
+    cells = bytes(cells)
+
+    if multiprocessing.current_process().daemon:
+        found = configuredSearch(n, cells, solutions, configurations[0])
+        winner = 0
+    else:
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target = portfolioJob, args = (n, cells, solutions, configuration, index, results),
+                                           daemon = True)
+                   for index, configuration in enumerate(configurations)]
+        for worker in workers:
+            worker.start()
+        try:
+            # A Failed Search (Eg A Bad Configuration) Leaves The Race To The Others
+            deadline = None if timeout is None else timeit.default_timer() + timeout
+            failures = []
+            while True:
+                try:
+                    winner, found = results.get(timeout = PORTFOLIO_POLL)
+                except queue.Empty:
+                    # A Search Killed Outright (Eg Out Of Memory) Never Puts A Result
+                    if results.empty() and not any(worker.is_alive() for worker in workers):
+                        raise ValueError("{} of {} portfolio searches exited without a result".format(
+                            len(workers) - len(failures), len(workers)))
+                    if deadline is not None and timeit.default_timer() >= deadline:
+                        raise SearchBudgetExceeded()
+                    continue
+                if isinstance(found, list):
+                    break
+                failures.append(found)
+                if len(failures) == len(workers):
+                    raise ValueError("Every portfolio search failed: {}".format(failures[0]))
+        finally:
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.join()
+
+    if stats is not None:
+        stats["winner"] = winner
+    return [copyLike(Board(n, values), board) for values in found]
+
+# Seconds Between Checks That Some Portfolio Search Is Still Running
+PORTFOLIO_POLL = 0.1
+
+def portfolioJob(n, cells, solutions, configuration, index, results):
+    """
+    Run one configured search of portfolioSolve() in a worker process, putting (index, solutions
+    found as bytes) on results, or (index, error message) if the search failed
+    """
+    try:
+        results.put((index, configuredSearch(n, cells, solutions, configuration)))
+    except Exception as error:
+        results.put((index, "{}: {}".format(type(error).__name__, error)))
+
+def configuredSearch(n, cells, solutions, configuration):
+    """
+    Search a board as one configuration of a portfolio
+
+    A configuration with "restartNodes" gives up after that many search nodes and starts again
+    from scratch (trying options in a new random order if "shuffle" is set), doubling the budget
+    each time, so an unlucky early guess is abandoned rather than searched to the end.
+
+    Args:
+        n (int): board width
+        cells (bytes): the n * n values row by row (0 for empty)
+        solutions (int): number of solutions wanted
+        configuration (dict): "branching" (one of BRANCHING), "tieBreak" (one of TIE_BREAKS),
+                              "shuffle" (bool), "seed" (for the random generator) and
+                              "restartNodes" (int, or None for one search to the end); all optional
+
+    Returns:
+        list: the solutions found as bytes, at most solutions; fewer only if there are no more
+    """
+    random.seed(configuration.get("seed"))
+    budget = configuration.get("restartNodes")
+    while True:
+        found = []
+        try:
+            for solved in searchSolutions(Candidates(Board(n, cells)), configuration.get("branching", "mrv"),
+                                          configuration.get("tieBreak", "first"), configuration.get("shuffle", False),
+                                          stats = {}, nodeBudget = budget):
+                found.append(bytes(solved.cells))
+                if len(found) >= solutions:
+                    break
+            return found
+        except SearchBudgetExceeded:
+            budget *= 2
+
+# Searches Raced By portfolioSolve(): The Default Order, Minimum Remaining Values With Two Tie
+# Breaks, And Randomised Searches With Restarts
+PORTFOLIO = (
+    {"branching": "quickHint"},
+    {"branching": "mrv", "tieBreak": "first"},
+    {"branching": "mrv", "tieBreak": "degree"},
+    {"branching": "mrv", "tieBreak": "random", "shuffle": True, "seed": 1, "restartNodes": 64},
+)
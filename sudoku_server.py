@@ -0,0 +1,369 @@
+"""
+Local JSON lines server for the sudoku engine, loaded by the "serve" command.
+
+Author: Thomas O'Mara
+Date: 2024
+License: MIT License
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import multiprocessing
+import random
+import sys
+import threading
+import timeit
+
+from sudoku_engine import (Board, Candidates, SearchBudgetExceeded, boardToLine, cluesConsistent, countSolutions,
+                           generate, grade, hint, options, searchSolutions)
+
+def serviceRequest(request, timeout):
+    """
+    Answer one count, generate, grade or hint request for SudokuServer in a worker process
+
+    Args:
+        request (dict): decoded request (see SudokuServer)
+        timeout (float): seconds left before the request's deadline
+
+    Returns:
+        dict: the reply fields
+    """
+    op = request.get("op")
+    if op == "generate":
+        k = int(request.get("size", 3))
+        if not 2 <= k <= SERVICE_MAX_SIZE:
+            raise ValueError("Board size must be 2 to {}, not {}".format(SERVICE_MAX_SIZE, k))
+        # Stop At The Deadline Rather Than Keep The Worker After The Reply Has Gone
+        try:
+            board = generate(k, verbose = False, symmetry = request.get("symmetry", "none"),
+                             difficulty = request.get("difficulty", "any"), deadline = timeit.default_timer() + timeout)
+        except SearchBudgetExceeded:
+            return {"status": "budget exceeded"}
+        return {"board": boardToLine(board)}
+
+    board = requestBoard(request)
+    if op == "count":
+        status, count = countSolutions(board, int(request.get("limit", 2)), request.get("nodeBudget"), timeout)
+        return {"status": status, "count": count}
+    if op == "grade":
+        # Grading Has No Budget, So Only Grade Boards Proven Unique In Time
+        status, count = countSolutions(board, 2, timeout = timeout)
+        if status != "unique":
+            return {"status": status}
+        return grade(board)
+    if op == "hint":
+        row, col = hint(board)
+        if row is None:
+            return {"row": None, "col": None, "options": []}
+        return {"row": row, "col": col, "options": options(board, row, col)}
+    raise ValueError("Unknown op '{}'".format(op))
+
+# Requests Answered By SudokuServer
+SERVICE_OPS = ("solve", "count", "generate", "grade", "hint")
+
+# Biggest Sub Grid Size Of Generated Boards (25 x 25)
+SERVICE_MAX_SIZE = 5
+
+# Numeric Request Fields Checked By checkRequest(): (Lowest, Highest, Integer Only)
+SERVICE_FIELDS = {
+    "timeout": (0.001, 3600, False),
+    "limit": (1, 10**9, True),
+    "nodeBudget": (1, 10**12, True),
+    "size": (2, SERVICE_MAX_SIZE, True),
+}
+
+def serviceSolveBatch(jobs):
+    """
+    Answer a micro batch of solve requests for SudokuServer in a worker process
+
+    Jobs are run in deadline order, so a request is never held behind one with a later deadline,
+    and each reply is also put on the worker's reply queue (see serviceWorkerStart()) as soon as
+    it is ready, so it is not held until the whole batch is done.
+
+    Args:
+        jobs (list): (token, request, timeout) for each solve request
+
+    Returns:
+        list: (token, reply) for each request, in job order; the reply dict holds "solution" (the
+        board line, or None if there is none) and "status" ("solved", "none" or "budget
+        exceeded"); or "error"
+    """
+    # Every Deadline Counts From The Batch Start, So A Batch Never Outlives Its Last Deadline
+    start = timeit.default_timer()
+    replies = [None] * len(jobs)
+    for index in sorted(range(len(jobs)), key = lambda index: jobs[index][2]):
+        token, request, timeout = jobs[index]
+        replies[index] = (token, serviceSolve(request, start + timeout))
+        if SERVICE_REPLIES is not None:
+            SERVICE_REPLIES.put(replies[index])
+    return replies
+
+def serviceSolve(request, deadline):
+    """
+    Answer one solve request of serviceSolveBatch(), searching until deadline (a
+    timeit.default_timer() value)
+
+    Returns:
+        dict: the reply fields
+    """
+    try:
+        cands = Candidates(requestBoard(request))
+    except ValueError as error:
+        return {"error": str(error)}
+    solution = None
+    status = "none"
+    if cluesConsistent(cands):
+        try:
+            for solved in searchSolutions(cands, "mrv", deadline = deadline):
+                solution = boardToLine(solved)
+                status = "solved"
+                break
+        except SearchBudgetExceeded:
+            status = "budget exceeded"
+    return {"solution": solution, "status": status}
+
+def serviceWorkerStart(replies):
+    """
+    Set up a SudokuServer worker process: reseed the random generator (workers inherit the
+    random state) for generate, and keep the queue serviceSolveBatch() puts each reply on
+    """
+    global SERVICE_REPLIES
+    random.seed()
+    SERVICE_REPLIES = replies
+
+# Reply Queue Of This Worker Process, Set By serviceWorkerStart()
+SERVICE_REPLIES = None
+
+def checkRequest(request):
+    """
+    Check the numeric fields of a server request before it is sent to the worker pool
+
+    Raises:
+        ValueError: if a field of SERVICE_FIELDS is not a number (an int where one is needed) in
+                    its range; NaN and infinity are never in range
+    """
+    for field, (low, high, integer) in SERVICE_FIELDS.items():
+        value = request.get(field)
+        if value is None and (field not in request or field == "nodeBudget"):
+            continue
+        number = isinstance(value, int if integer else (int, float)) and not isinstance(value, bool)
+        if not number or not low <= value <= high:
+            raise ValueError("'{}' must be {} from {} to {}".format(field, "an integer" if integer else "a number",
+                                                                   low, high))
+
+def requestBoard(request):
+    """
+    Board of a server request, sent as a line encoded by boardToLine()
+    """
+    line = request.get("board")
+    if not isinstance(line, str):
+        raise ValueError("The request needs a board line")
+    return Board.fromLine(line)
+
+class SudokuServer:
+    """
+    Local server answering solve, count, generate, grade and hint requests, so scripts pay the
+    Python start up and warm up once rather than on every call
+
+    Each connection sends one JSON object per line, eg {"id": 1, "op": "solve", "board": "..."},
+    and gets one JSON object per line back, carrying the same "id", in the order requests finish.
+    Boards are lines encoded by boardToLine().  Every request may give a "timeout" in seconds; past
+    it the reply is {"error": "deadline exceeded"}.  Errors are replied as {"error": message}.
+    Requests are independent, so any number may be in flight on a connection.
+
+    The work runs in a pool of worker processes.  Solve requests arriving within batchWindow
+    seconds of each other are sent to a worker as one batch, each board still searching within
+    its own deadline, counted from the start of the batch.  A batch is run in deadline order and
+    each reply is sent as soon as its board is done.  Every op but grade and hint (which
+    only run on boards already checked in time) stops in its worker at the deadline, and
+    generate only makes boards up to SERVICE_MAX_SIZE, so a worker is never held long after the
+    reply has gone.
+
+    Args:
+        workers (int, optional): worker processes. Defaults to the number of CPUs.
+        timeout (float, optional): deadline of requests that do not give one. Defaults to 10.
+        batchSize (int, optional): most solve requests in one batch. Defaults to 64.
+        batchWindow (float, optional): seconds to wait for more solve requests to batch.
+                                       Defaults to 0.002.
+    """
+
+    def __init__(self, workers = None, timeout = 10.0, batchSize = 64, batchWindow = 0.002):
+        self.workers = workers
+        self.timeout = timeout
+        self.batchSize = batchSize
+        self.batchWindow = batchWindow
+        self.pool = None
+        self.solveQueue = []
+        self.solveQueued = None
+        self.solveReplies = None
+        self.solveWaiting = {}
+        self.solveTokens = itertools.count()
+
+    async def run(self, host = "127.0.0.1", port = 8765, path = None, ready = None):
+        """
+        Serve until cancelled, on TCP host:port or on the Unix socket at path if given
+
+        Args:
+            ready (function, optional): called with the listening asyncio server once it is
+                                        accepting connections. Defaults to None.
+        """
+        # Solve Replies Come Back One At A Time On A Queue Shared With Every Worker
+        context = multiprocessing.get_context()
+        self.solveReplies = context.Queue()
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.workers, context, initializer = serviceWorkerStart,
+                                                           initargs = (self.solveReplies,))
+        self.solveQueued = asyncio.Event()
+        batcher = asyncio.ensure_future(self.batchSolves())
+        reader = threading.Thread(target = self.readSolveReplies, args = (asyncio.get_running_loop(),), daemon = True)
+        reader.start()
+        try:
+            if path is not None:
+                server = await asyncio.start_unix_server(self.handle, path)
+            else:
+                server = await asyncio.start_server(self.handle, host, port)
+            async with server:
+                if ready is not None:
+                    ready(server)
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.solveReplies.put(None)
+            self.pool.shutdown(wait = False, cancel_futures = True)
+
+    async def handle(self, reader, writer):
+        """
+        Answer every request line sent on a connection
+        """
+        replies = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = asyncio.ensure_future(self.reply(line, writer))
+                replies.add(reply)
+                reply.add_done_callback(replies.discard)
+            await asyncio.gather(*replies)
+        except (ConnectionError, ValueError, asyncio.CancelledError):
+            # Closed Connection, A Line Over The Stream Limit, Or The Server Shutting Down
+            for reply in replies:
+                reply.cancel()
+        finally:
+            writer.close()
+
+    async def reply(self, line, writer):
+        """
+        Answer one request line, writing the reply line to writer
+        """
+        requestId = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object")
+            requestId = request.get("id")
+            checkRequest(request)
+            timeout = float(request.get("timeout", self.timeout))
+            answer = await asyncio.wait_for(self.answer(request, timeout), timeout)
+        except asyncio.TimeoutError:
+            answer = {"error": "deadline exceeded"}
+        except Exception as error:
+            # Any Failure Is Replied To, So Every Request Gets An Answer
+            answer = {"error": str(error) or type(error).__name__}
+        answer["id"] = requestId
+        writer.write((json.dumps(answer) + "\n").encode())
+        await writer.drain()
+
+    async def answer(self, request, timeout):
+        """
+        Reply fields for a request, computed in the worker pool
+        """
+        loop = asyncio.get_running_loop()
+        if request.get("op") not in SERVICE_OPS:
+            raise ValueError("Unknown op '{}'".format(request.get("op")))
+        if request.get("op") == "solve":
+            token = next(self.solveTokens)
+            future = loop.create_future()
+            self.solveWaiting[token] = future
+            try:
+                self.solveQueue.append((token, request, loop.time() + timeout))
+                self.solveQueued.set()
+                return await future
+            finally:
+                self.solveWaiting.pop(token, None)
+        return await loop.run_in_executor(self.pool, serviceRequest, request, timeout)
+
+    async def batchSolves(self):
+        """
+        Send queued solve requests to the worker pool in batches
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.solveQueued.wait()
+            await asyncio.sleep(self.batchWindow)
+            batch = self.solveQueue[:self.batchSize]
+            self.solveQueue = self.solveQueue[self.batchSize:]
+            if not self.solveQueue:
+                self.solveQueued.clear()
+
+            # Drop Requests Already Replied To, And Pass On Each Deadline As Seconds Left
+            jobs = [(token, request, max(deadline - loop.time(), 0)) for token, request, deadline in batch
+                    if token in self.solveWaiting]
+            if jobs:
+                results = loop.run_in_executor(self.pool, serviceSolveBatch, jobs)
+                asyncio.ensure_future(self.deliver(jobs, results))
+
+    async def deliver(self, jobs, results):
+        """
+        Hand each reply of a solve batch not already read from the reply queue to the request
+        waiting for it, or the error if the batch failed
+        """
+        try:
+            replies = await results
+        except Exception as error:
+            replies = [(token, {"error": str(error)}) for token, request, timeout in jobs]
+        for token, reply in replies:
+            self.settleSolve(token, reply)
+
+    def readSolveReplies(self, loop):
+        """
+        Hand each solve reply put on the reply queue by a worker to the event loop, in a thread
+        of its own until the None put on the queue when the server stops
+        """
+        while True:
+            item = self.solveReplies.get()
+            if item is None:
+                return
+            try:
+                loop.call_soon_threadsafe(self.settleSolve, *item)
+            except RuntimeError:
+                # The Event Loop Has Closed
+                return
+
+    def settleSolve(self, token, reply):
+        """
+        Reply to the solve request of token, if it is still waiting
+        """
+        future = self.solveWaiting.pop(token, None)
+        if future is not None and not future.done():
+            future.set_result(reply)
+
+def serve(host = "127.0.0.1", port = 8765, path = None, workers = None, timeout = 10.0, batchSize = 64,
+          batchWindow = 0.002):
+    """
+    Run a SudokuServer until interrupted
+
+    Args:
+        host (str, optional): TCP address to listen on. Defaults to "127.0.0.1".
+        port (int, optional): TCP port to listen on. Defaults to 8765.
+        path (str, optional): listen on this Unix socket instead of TCP. Defaults to None.
+        workers, timeout, batchSize, batchWindow: as for SudokuServer
+    """
+    server = SudokuServer(workers, timeout, batchSize, batchWindow)
+    ready = lambda listening: print("Serving on {}".format(path or "{}:{}".format(*listening.sockets[0].getsockname())),
+                                    file = sys.stderr)
+    try:
+        asyncio.run(server.run(host, port, path, ready))
+    except KeyboardInterrupt:
+        pass